@@ -0,0 +1,82 @@
+"""Compare the sync read endpoints under gunicorn (WSGI) with their async twins under uvicorn (ASGI).
+
+Seed some data first (any talent with applications will do), then run from the repository root:
+
+    python -m benchmarks.asgi_vs_wsgi --talent 1 --role 1 --concurrency 500 --duration 30
+
+Prints requests/sec and p50/p95/p99 latency per server and endpoint as JSON.
+"""
+
+import argparse
+import itertools
+import json
+import subprocess  # nosec B404 - starts the local servers under test
+import sys
+
+from .client import run, run_load, wait_until_listening
+
+HOST = '127.0.0.1'
+
+
+def servers(options):
+    yield 'wsgi', [
+        sys.executable,
+        '-m',
+        'gunicorn',
+        'casting_platform.wsgi',
+        '--workers',
+        str(options.workers),
+        '--threads',
+        str(options.threads),
+        '--bind',
+        f'{HOST}:{options.port}',
+    ], {
+        'talent': f'/api/talent/{options.talent}/',
+        'application_list': f'/api/role/{options.role}/list/',
+    }
+    yield 'asgi', [
+        sys.executable,
+        '-m',
+        'uvicorn',
+        'casting_platform.asgi:application',
+        '--workers',
+        str(options.workers),
+        '--host',
+        HOST,
+        '--port',
+        str(options.port),
+        '--no-access-log',
+    ], {
+        'talent': f'/api/talent/{options.talent}/async/',
+        'application_list': f'/api/role/{options.role}/list/async/',
+    }
+
+
+def benchmark(command, paths, options):
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # nosec B603
+    try:
+        run(wait_until_listening(HOST, options.port))
+        requests = itertools.cycle([(name, 'GET', path, None) for name, path in paths.items()])
+        return run(run_load(HOST, options.port, lambda: next(requests), options.concurrency, options.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--talent', type=int, required=True, help='pk of the talent to fetch')
+    parser.add_argument('--role', type=int, required=True, help='id of the role whose applicants are listed')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='threads per gunicorn worker')
+    parser.add_argument('--port', type=int, default=8765)
+    options = parser.parse_args()
+
+    results = {name: benchmark(command, paths, options) for name, command, paths in servers(options)}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
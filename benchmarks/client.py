@@ -0,0 +1,138 @@
+"""A small asyncio HTTP/1.1 load client built on the standard library only."""
+
+import asyncio
+import json
+import time
+from collections import defaultdict
+
+
+class Connection:
+    """A keep-alive HTTP/1.1 connection that reconnects whenever the server closes it."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        payload = b'' if body is None else json.dumps(body).encode()
+        head = (
+            f'{method} {path} HTTP/1.1\r\n'
+            f'Host: {self.host}:{self.port}\r\n'
+            'Accept: application/json\r\n'
+            'Content-Type: application/json\r\n'
+            f'Content-Length: {len(payload)}\r\n\r\n'
+        )
+        self.writer.write(head.encode() + payload)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            content = b''
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                content += await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            content = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            content = await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, content
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def run_load(host, port, next_request, concurrency=50, duration=10.0):
+    """Replay ``next_request()`` from ``concurrency`` connections for ``duration`` seconds.
+
+    ``next_request`` returns ``(name, method, path, body)``. Latencies are collected per request name.
+    """
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        connection = Connection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                name, method, path, body = next_request()
+                started = time.perf_counter()
+                try:
+                    status, _ = await connection.request(method, path, body)
+                except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                    errors[name] += 1
+                    await connection.close()
+                    continue
+                latencies[name].append(time.perf_counter() - started)
+                if status >= 500:
+                    errors[name] += 1
+        finally:
+            await connection.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {name: summarize(samples, elapsed, errors[name]) for name, samples in sorted(latencies.items())}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples, elapsed, errors=0):
+    """Throughput and latency percentiles (in milliseconds) of one endpoint."""
+
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': round(len(samples) / elapsed, 1),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 2),
+    }
+
+
+async def wait_until_listening(host, port, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+        else:
+            writer.close()
+            return
+
+
+def run(coroutine):
+    """Run a coroutine to completion, ``asyncio.run`` only exists from Python 3.7."""
+
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
@@ -0,0 +1,117 @@
+"""Replay a mixed casting workload against a running server and report per-endpoint latency as JSON.
+
+Seed the database and start a server on it first, e.g.:
+
+    python manage.py seed_benchmark --talents 100000
+    gunicorn casting_platform.wsgi --workers 4 --bind 127.0.0.1:8000
+    python -m benchmarks.run --port 8000 --concurrency 100 --duration 60 --output bench.json
+
+Talent and role ids are sampled from the configured database, so run it with the server's settings.
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess  # nosec B404 - reads the current commit
+import time
+
+from .client import run, run_load, wait_until_listening
+
+# Share of each operation in the replayed traffic.
+WORKLOAD = {
+    'browse': 40,
+    'list': 25,
+    'apply': 20,
+    'update': 15,
+}
+
+
+def load_samples(size):
+    """Sample talent and role ids, plus talent payloads for updates, from the configured database."""
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'casting_platform.settings')
+    import django
+
+    django.setup()
+    from casting_app.models import Role, Talent
+    from casting_app.serializers import TalentSerializer
+
+    talents = list(Talent.objects.order_by('?').values('id', *TalentSerializer.Meta.fields)[:size])
+    role_ids = list(Role.objects.order_by('?').values_list('id', flat=True)[:size])
+    if not talents or not role_ids:
+        raise SystemExit('No data to replay, run "python manage.py seed_benchmark" first')
+    return talents, role_ids
+
+
+def workload(talents, role_ids, rng):
+    """Return a function producing the next ``(name, method, path, body)`` request of the mix."""
+
+    operations = list(WORKLOAD)
+    weights = list(WORKLOAD.values())
+
+    def next_request():
+        operation = rng.choices(operations, weights)[0]
+        talent = rng.choice(talents)
+        role_id = rng.choice(role_ids)
+        if operation == 'browse':
+            return rng.choice(
+                [
+                    ('talent_get', 'GET', f'/api/talent/{talent["id"]}/', None),
+                    ('talent_search', 'GET', f'/api/talent/search/?gender={talent["gender"]}&ordering=age', None),
+                    ('talent_eligible_roles', 'GET', f'/api/talent/{talent["id"]}/eligible-roles/', None),
+                    ('role_stats', 'GET', f'/api/role/{role_id}/stats/', None),
+                ]
+            )
+        if operation == 'list':
+            return 'application_list', 'GET', f'/api/role/{role_id}/list/', None
+        if operation == 'apply':
+            return 'application_create', 'POST', '/api/role/apply/', {'talent': talent['id'], 'role': role_id}
+        body = {key: value for key, value in talent.items() if key != 'id'}
+        body['age'] = talent['age'] + rng.choice([-1, 1])
+        return 'talent_update', 'PUT', f'/api/talent/{talent["id"]}/', body
+
+    return next_request
+
+
+def current_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], universal_newlines=True).strip()  # nosec B603 B607
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--samples', type=int, default=1000, help='Talents and roles sampled for the requests.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Also write the JSON report to this file.')
+    options = parser.parse_args()
+
+    talents, role_ids = load_samples(options.samples)
+    next_request = workload(talents, role_ids, random.Random(options.seed))  # nosec B311 - traffic mix
+
+    run(wait_until_listening(options.host, options.port))
+    endpoints = run(run_load(options.host, options.port, next_request, options.concurrency, options.duration))
+
+    report = {
+        'commit': current_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'concurrency': options.concurrency,
+        'duration': options.duration,
+        'workload': WORKLOAD,
+        'endpoints': endpoints,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as report_file:
+            report_file.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Compare ModelSerializer and the .values() fast path on the talents of the configured database.
+
+Seed the database first, then run from the repository root:
+
+    python manage.py seed_benchmark --talents 100000
+    python -m benchmarks.serializers --rows 2000 --repeat 5
+
+Prints the best rows/s of each path over the repeats as JSON, querying included.
+"""
+
+import argparse
+import json
+import os
+import time
+
+
+def best_time(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'casting_platform.settings')
+    import django
+
+    django.setup()
+    from casting_app.fast_serializers import ValuesSerializer
+    from casting_app.models import Talent
+    from casting_app.serializers import TalentSerializer
+
+    queryset = Talent.objects.order_by('id')[: options.rows]
+    rows = queryset.count()
+    if not rows:
+        raise SystemExit('No talents to serialize, run "python manage.py seed_benchmark" first')
+    fast = ValuesSerializer(TalentSerializer)
+    timings = {
+        'model_serializer': best_time(lambda: TalentSerializer(queryset.all(), many=True).data, options.repeat),
+        'values': best_time(lambda: fast.to_representation(fast.values(queryset.all())), options.repeat),
+    }
+    print(
+        json.dumps({'rows': rows, 'rows_per_second': {name: round(rows / t) for name, t in timings.items()}}, indent=2)
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Database-backed queue of applications, drained in batches by ``process_application_queue`` workers.
+
+Workers claim pending tickets with a conditional UPDATE, so several of them can share the queue without handing
+out a ticket twice. A claim lives in its own transaction: tickets of a worker that dies mid-batch stay in
+``processing`` until ``release_stale_tickets`` hands them back to the queue.
+
+A worker locks the tickets it still owns for the whole batch, and only writes outcomes where its claim still holds,
+so a batch slower than the stale timeout is neither requeued under it nor overwritten by another worker.
+"""
+
+import json
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ApplicationTicket
+from .serializers import ApplicationBulkSerializer
+
+
+def claim_tickets(batch_size):
+    """Claim up to ``batch_size`` pending tickets, oldest first, for this worker."""
+
+    ids = list(
+        ApplicationTicket.objects.filter(status=ApplicationTicket.PENDING)
+        .order_by('id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+
+    claim = uuid.uuid4()
+    # Only tickets still pending are claimed, a concurrent worker may have taken some of them meanwhile.
+    ApplicationTicket.objects.filter(id__in=ids, status=ApplicationTicket.PENDING).update(
+        status=ApplicationTicket.PROCESSING, claim=claim, claimed_at=timezone.now()
+    )
+    return list(ApplicationTicket.objects.filter(id__in=ids, claim=claim).order_by('id'))
+
+
+def process_tickets(tickets):
+    """Insert claimed tickets through the bulk application path and record the outcome of each.
+
+    Tickets whose claim was lost, requeued as stale and maybe claimed again by another worker, are left alone and
+    their results dropped. Returns the results of the tickets processed.
+    """
+
+    if not tickets:
+        return []
+    claim = tickets[0].claim
+    with transaction.atomic():
+        owned = set(
+            ApplicationTicket.objects.select_for_update()
+            .filter(id__in=[ticket.id for ticket in tickets], claim=claim, status=ApplicationTicket.PROCESSING)
+            .values_list('id', flat=True)
+        )
+        tickets = [ticket for ticket in tickets if ticket.id in owned]
+        if not tickets:
+            return []
+
+        serializer = ApplicationBulkSerializer(
+            data={'applications': [{'talent': ticket.talent_id, 'role': ticket.role_id} for ticket in tickets]}
+        )
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        # One conditional UPDATE per outcome, written only where this worker's claim still holds.
+        outcomes = defaultdict(list)
+        for ticket, result in zip(tickets, results):
+            outcomes[result['status'], json.dumps(result.get('errors'), sort_keys=True)].append(ticket.id)
+        now = timezone.now()
+        for (outcome, errors), ids in outcomes.items():
+            ApplicationTicket.objects.filter(id__in=ids, claim=claim, status=ApplicationTicket.PROCESSING).update(
+                status=outcome, errors=json.loads(errors), processed_at=now
+            )
+    return results
+
+
+def release_stale_tickets(timeout):
+    """Put back in the queue tickets claimed more than ``timeout`` seconds ago and never processed.
+
+    Tickets of a batch being processed are locked by their worker, so the release waits for the batch to commit
+    and then skips them.
+    """
+
+    return ApplicationTicket.objects.filter(
+        status=ApplicationTicket.PROCESSING, claimed_at__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status=ApplicationTicket.PENDING, claim=None, claimed_at=None)
+
+
+def drain(batch_size=500):
+    """Process pending tickets batch after batch until the queue is empty, returning how many were processed."""
+
+    processed = 0
+    while True:
+        tickets = claim_tickets(batch_size)
+        if not tickets:
+            return processed
+        processed += len(process_tickets(tickets))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CastingAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'casting_app'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
@@ -0,0 +1,83 @@
+"""Async read endpoints for ASGI deployments.
+
+Django 3.2 has no async ORM, so database work runs through ``sync_to_async``. Its ASGI handler sets up no
+per-request ``ThreadSensitiveContext``, so the default ``thread_sensitive=True`` would run the queries of every
+concurrent request one at a time on a single shared thread. These reads only use the ORM and the cache, so they run
+with ``thread_sensitive=False`` on the default executor, each thread keeping its own database connection.
+Executor threads never see ``request_started`` or ``request_finished``, so each call closes expired or broken
+connections before and after its queries, as a request would.
+
+The whole middleware chain is async-capable (see ``casting_app.middleware``), so a request only holds a thread
+while its queries run.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import Http404, HttpResponseNotAllowed, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.request import Request
+
+from . import cache
+from .conditional import application_list_etag
+from .models import Talent
+from .serializers import TalentSerializer
+from .signals import check_persistent_connections
+from .views import ApplicationList
+
+
+def _in_executor(function):
+    """Run ``function`` on the default executor, managing its thread's connections like a request would."""
+
+    def run(*args):
+        close_old_connections()
+        check_persistent_connections(sender=None)
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def _talent_data(pk):
+    try:
+        return TalentSerializer(cache.get_talent(pk)).data
+    except Talent.DoesNotExist:
+        raise Http404
+
+
+def _application_list_response(request, role_id):
+    """``ApplicationList`` pages, with the same ETag and ``order`` choices. Exports stay on the sync endpoint."""
+
+    if 'export' in request.GET:
+        raise ValidationError({'export': ['Export applicants from the synchronous endpoint']})
+    etag = quote_etag(application_list_etag(request, role_id))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        view = ApplicationList(request=Request(request), kwargs={'role_id': role_id}, format_kwarg=None)
+        response = JsonResponse(view.get_page().data)
+    response['ETag'] = etag
+    return response
+
+
+async def talent_retrieve(request, pk):
+    """Get a talent."""
+
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    return JsonResponse(await _in_executor(_talent_data)(pk))
+
+
+async def application_list(request, role_id):
+    """Show talents who applies for a certain role."""
+
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        return await _in_executor(_application_list_response)(request, role_id)
+    except APIException as exc:
+        # Shaped like DRF's exception handler output.
+        data = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+        return JsonResponse(data, status=exc.status_code, safe=False)
@@ -0,0 +1,74 @@
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Role, Talent
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.CASTING_CACHE_ALIAS]
+
+
+def _key(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def _queryset(model):
+    # Cached roles carry their accepted traits so matching never queries them.
+    if model is Role:
+        return Role.objects.prefetch_related('traits')
+    return model.objects.all()
+
+
+def _count(model, outcome):
+    with _stats_lock:
+        _stats[(model._meta.model_name, outcome)] += 1
+
+
+def get_instance(model, pk):
+    """Read-through lookup of a single row, raising ``model.DoesNotExist`` like ``objects.get``."""
+
+    key = _key(model, pk)
+    instance = _cache().get(key)
+    if instance is not None:
+        _count(model, 'hits')
+        return instance
+
+    _count(model, 'misses')
+    instance = _queryset(model).get(pk=pk)
+    _cache().set(key, instance)
+    return instance
+
+
+def get_talent(pk):
+    return get_instance(Talent, pk)
+
+
+def get_role(pk):
+    return get_instance(Role, pk)
+
+
+def invalidate(model, pk):
+    _cache().delete(_key(model, pk))
+
+
+def invalidate_many(model, pks):
+    _cache().delete_many([_key(model, pk) for pk in pks])
+
+
+def cache_stats():
+    """Hit and miss counters of this process, per model."""
+
+    with _stats_lock:
+        return {
+            model._meta.model_name: {
+                'hits': _stats[(model._meta.model_name, 'hits')],
+                'misses': _stats[(model._meta.model_name, 'misses')],
+            }
+            for model in (Talent, Role)
+        }
@@ -0,0 +1,97 @@
+"""Per-role application caps.
+
+``Role.application_count`` counts the applications of a role. It only moves through the conditional UPDATEs
+below, run in the transaction inserting the applications, so concurrent requests can never take a role past its
+``max_applications`` and a full role is turned down without reading ``Application`` at all. The UPDATE that fills
+a role also closes it, which takes it out of browsing and search.
+
+A single counter row per role is enough: inserting an application already locks the role's statistics row in
+``casting_app.stats``, so sharding the counter would not let more applications through at once.
+"""
+
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Application, Role
+
+
+def _has_room(count):
+    return Q(max_applications__isnull=True) | Q(max_applications__gte=F('application_count') + count)
+
+
+def reserve(role_id, count=1):
+    """Count ``count`` more applications against a role, returning ``False`` when that would exceed its cap."""
+
+    return bool(
+        Role.objects.filter(_has_room(count), pk=role_id).update(
+            application_count=F('application_count') + count,
+            is_open=Case(
+                When(max_applications__lte=F('application_count') + count, then=Value(False)),
+                default=F('is_open'),
+            ),
+        )
+    )
+
+
+def lock_places(role_ids):
+    """Lock the capped roles among ``role_ids`` until the end of the transaction and return their places left.
+
+    Roles without a cap are left out. Pair with ``add_applications`` once the applications are inserted.
+    """
+
+    capped = (
+        Role.objects.select_for_update()
+        .filter(id__in=role_ids, max_applications__isnull=False)
+        .values_list('id', 'application_count', 'max_applications')
+    )
+    return {role_id: max(0, max_applications - count) for role_id, count, max_applications in capped}
+
+
+def add_applications(counts, places):
+    """Count inserted applications, ``counts`` mapping role ids to how many, and close the roles they fill.
+
+    ``places`` are the places left returned by ``lock_places`` in the same transaction. A single UPDATE whatever
+    the number of roles.
+    """
+
+    counts = {role_id: count for role_id, count in counts.items() if count}
+    if not counts:
+        return
+    filled = [role_id for role_id, count in counts.items() if role_id in places and count >= places[role_id]]
+    Role.objects.filter(id__in=counts).update(
+        application_count=F('application_count')
+        + Case(*(When(id=role_id, then=Value(count)) for role_id, count in counts.items()), default=Value(0)),
+        is_open=Case(When(id__in=filled, then=Value(False)), default=F('is_open')),
+    )
+
+
+def release(role_id, count=1):
+    """Uncount ``count`` deleted applications of a role, reopening it when it was full.
+
+    Applications inserted without ``reserve`` were never counted, hence the floor at zero.
+    """
+
+    Role.objects.filter(pk=role_id).update(
+        application_count=Greatest(F('application_count') - count, Value(0)),
+        is_open=Case(
+            When(max_applications__lte=F('application_count'), then=Value(True)),
+            default=F('is_open'),
+        ),
+    )
+
+
+def recount_applications(role_ids=None):
+    """Reset the counters of every role, or only ``role_ids``, from the applications table.
+
+    Needed after inserting or deleting applications in bulk without going through ``reserve`` and ``release``.
+    """
+
+    counts = (
+        Application.objects.filter(role_id=OuterRef('pk'))
+        .order_by()
+        .values('role_id')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    roles = Role.objects.all() if role_ids is None else Role.objects.filter(id__in=role_ids)
+    return roles.update(application_count=Coalesce(Subquery(counts), Value(0)))
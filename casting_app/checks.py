@@ -0,0 +1,21 @@
+import os
+
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def check_cache_is_shared(app_configs, **kwargs):
+    """Signal-based invalidation only reaches the worker that saved a row when the casting cache is per process."""
+
+    backend = settings.CACHES[settings.CASTING_CACHE_ALIAS]['BACKEND']
+    workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    if backend.endswith('.LocMemCache') and workers > 1:
+        return [
+            Error(
+                f'The casting cache is private to each process but WEB_CONCURRENCY runs {workers} workers.',
+                hint='Unset CASTING_CACHE_BACKEND to share the cache between workers, or set WEB_CONCURRENCY=1.',
+                id='casting_app.E001',
+            )
+        ]
+    return []
@@ -0,0 +1,49 @@
+"""ETag and Last-Modified functions for ``django.views.decorators.http.condition``.
+
+Each one answers from the talent cache or a single aggregate query, so a 304 never serializes the payload.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+
+from . import cache
+from .models import Application, Talent
+
+
+def talent_last_modified(request, pk):
+    try:
+        return cache.get_talent(pk).updated_at
+    except Talent.DoesNotExist:
+        return None
+
+
+def talent_etag(request, pk):
+    last_modified = talent_last_modified(request, pk)
+    if last_modified is None:
+        return None
+    return f'talent-{pk}-{last_modified.timestamp()}'
+
+
+def _application_list_state(request, role_id):
+    """Count and latest changes of a role's applicants, computed once per request."""
+
+    if not hasattr(request, '_application_list_state'):
+        request._application_list_state = Application.objects.filter(role_id=role_id).aggregate(
+            count=Count('id'), application=Max('updated_at'), talent=Max('talent__updated_at')
+        )
+    return request._application_list_state
+
+
+def application_list_etag(request, role_id):
+    """ETag of a role's applicants.
+
+    There is no Last-Modified counterpart: deleting an application leaves the latest ``updated_at`` unchanged,
+    so only the ETag, which also covers the applicant count, notices it.
+    """
+
+    state = _application_list_state(request, role_id)
+    changes = [state['application'], state['talent']]
+    last_change = max(changes).timestamp() if all(changes) else None
+    fingerprint = f'{role_id}:{state["count"]}:{last_change}:{request.GET.urlencode()}'
+    return hashlib.sha256(fingerprint.encode()).hexdigest()
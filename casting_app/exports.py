@@ -0,0 +1,63 @@
+import csv
+import json
+
+from .models import Application
+
+# Column name and lookup of each exported field.
+EXPORT_COLUMNS = [
+    ('application_id', 'id'),
+    ('datetime_applied', 'datetime_applied'),
+    ('company_id', 'role__project__company_id'),
+    ('company', 'role__project__company__name'),
+    ('project_id', 'role__project_id'),
+    ('project', 'role__project__name'),
+    ('role_id', 'role_id'),
+    ('role', 'role__name'),
+    ('talent_id', 'talent_id'),
+    ('talent', 'talent__name'),
+    ('email', 'talent__email'),
+    ('phone_number', 'talent__phone_number'),
+    ('age', 'talent__age'),
+    ('gender', 'talent__gender'),
+    ('ethnicity', 'talent__ethnicity'),
+    ('weight', 'talent__weight'),
+    ('height', 'talent__height'),
+    ('match_score', 'match_score'),
+]
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def export_rows(project_id=None, company_id=None, chunk_size=2000):
+    """Stream the applications of a project or a company joined with their talent, role, project and company.
+
+    A single query read through a server-side cursor where the database supports it.
+    """
+
+    applications = Application.objects.order_by('id')
+    if project_id is not None:
+        applications = applications.filter(role__project_id=project_id)
+    if company_id is not None:
+        applications = applications.filter(role__project__company_id=company_id)
+    return applications.values_list(*(lookup for _, lookup in EXPORT_COLUMNS)).iterator(chunk_size=chunk_size)
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def render(rows, file_format):
+    """Lazily encode exported rows as lines of CSV or NDJSON."""
+
+    columns = [column for column, _ in EXPORT_COLUMNS]
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow(row)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, row)), default=str) + '\n'
@@ -0,0 +1,48 @@
+from django.db.models import F
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .renderers import FastJSONRenderer
+
+
+class ValuesSerializer:
+    """Read-only fast path producing the same rows as ``serializer_class(many=True).data``.
+
+    Rows come straight from ``.values()``, skipping model instantiation and the per-field ``to_representation``
+    calls of DRF. Only valid for serializers made of plain columns and primary key relations of the queried
+    model or, when ``source`` names a relation, of the related model.
+    """
+
+    def __init__(self, serializer_class, source=None):
+        self.field_names = [name for name, field in serializer_class().fields.items() if not field.write_only]
+        self.source = source
+
+    def values(self, queryset, *keys):
+        """``queryset.values()`` with the serializer fields plus ``keys`` columns of the queried model."""
+
+        keys = [key for key in keys if self.source is not None or key not in self.field_names]
+        if self.source is None:
+            return queryset.values(*self.field_names, *keys)
+        return queryset.values(*keys, **{name: F(f'{self.source}__{name}') for name in self.field_names})
+
+    def iter_representation(self, rows):
+        for row in rows:
+            yield {name: row[name] for name in self.field_names}
+
+    def to_representation(self, rows):
+        return list(self.iter_representation(rows))
+
+
+class ValuesListMixin:
+    """List views serving ``values_serializer`` rows instead of serializing model instances."""
+
+    values_serializer = None
+    values_keys = ('id',)
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        rows = self.values_serializer.values(self.filter_queryset(self.get_queryset()), *self.values_keys)
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(self.values_serializer.to_representation(rows))
+        return self.get_paginated_response(self.values_serializer.to_representation(page))
@@ -0,0 +1,119 @@
+"""Offline geocoding and geohash bucketing of project locations.
+
+Projects are geocoded from ``data/gazetteer.csv`` and indexed on a geohash: points sharing a geohash prefix lie in
+the same cell. A radius search covers the bounding box of its circle with at most ``MAX_CELLS`` cells, at the finest
+precision that allows. Each cell is an index range on the geohash column, so only rows in those cells are read.
+"""
+
+import csv
+import math
+from functools import lru_cache
+from pathlib import Path
+
+GAZETTEER = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 9
+# Most index ranges a radius search reads.
+MAX_CELLS = 32
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+@lru_cache(maxsize=1)
+def _gazetteer():
+    with open(GAZETTEER, newline='', encoding='utf-8') as places:
+        return {
+            _normalize(place['name']): (float(place['latitude']), float(place['longitude']))
+            for place in csv.DictReader(places)
+        }
+
+
+def _normalize(name):
+    return ' '.join(name.lower().replace(',', ' ').split())
+
+
+def geocode(location):
+    """Coordinates of a place name from the gazetteer, or ``None``.
+
+    ``"Giza, Egypt"`` falls back to its first part when the whole name is unknown.
+    """
+
+    places = _gazetteer()
+    name = _normalize(location or '')
+    if name in places:
+        return places[name]
+    return places.get(_normalize(location.split(',')[0])) if location else None
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Geohash of a point."""
+
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, value, even = [], 0, 0, True
+    while len(geohash) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            geohash.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(geohash)
+
+
+def cell_size(precision, latitude=0.0):
+    """Height and width in kilometres of a geohash cell at ``latitude``."""
+
+    lat_bits = 5 * precision // 2
+    lon_bits = 5 * precision - lat_bits
+    height = 180 / 2**lat_bits * KM_PER_DEGREE
+    width = 360 / 2**lon_bits * KM_PER_DEGREE * math.cos(math.radians(latitude))
+    return height, width
+
+
+def covering_cells(latitude, longitude, radius_km, max_cells=MAX_CELLS):
+    """Geohash prefixes of the cells that together cover the circle around a point.
+
+    Uses the finest precision at which the cells overlapping the circle's bounding box number at most
+    ``max_cells``, so cells stay close to the size of the radius along both axes.
+    """
+
+    lat_span = radius_km / KM_PER_DEGREE
+    lat_low, lat_high = max(-90.0, latitude - lat_span), min(90.0, latitude + lat_span)
+    widest = max(abs(lat_low), abs(lat_high))
+    lon_span = 180.0 if widest >= 90 else radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest)))
+
+    for precision in range(PRECISION, 0, -1):
+        lat_bits = 5 * precision // 2
+        lat_step, lon_step = 180 / 2**lat_bits, 360 / 2 ** (5 * precision - lat_bits)
+        rows = range(int((lat_low + 90) // lat_step), min(int((lat_high + 90) // lat_step), 2**lat_bits - 1) + 1)
+        columns = 2 ** (5 * precision - lat_bits)
+        if lon_span >= 180:
+            first, last = 0, columns - 1
+        else:
+            first, last = int((longitude - lon_span + 180) // lon_step), int((longitude + lon_span + 180) // lon_step)
+        if len(rows) * min(last - first + 1, columns) <= max_cells or precision == 1:
+            break
+
+    cells = set()
+    for row in rows:
+        for column in range(first, min(last, first + columns - 1) + 1):
+            centre_lat = -90 + (row + 0.5) * lat_step
+            centre_lon = -180 + (column % columns + 0.5) * lon_step
+            cells.add(encode(centre_lat, centre_lon, precision))
+    return sorted(cells)
+
+
+def distance_km(latitude, longitude, other_latitude, other_longitude):
+    """Great-circle distance between two points."""
+
+    lat1, lat2 = math.radians(latitude), math.radians(other_latitude)
+    dlat, dlon = lat2 - lat1, math.radians(other_longitude - longitude)
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
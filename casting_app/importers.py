@@ -0,0 +1,121 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import cache
+from .models import Talent
+from .serializers import TalentSerializer
+
+FORMATS = ('csv', 'ndjson')
+
+
+def decode_lines(lines, encoding='utf-8'):
+    """Lazily decode an iterable of byte lines, raising ``UnicodeDecodeError`` on invalid or truncated input."""
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line in lines:
+        yield decoder.decode(line)
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def parse_rows(lines, file_format):
+    """Yield ``(row_number, data, error)`` for each CSV or NDJSON record of an iterable of text lines."""
+
+    if file_format == 'csv':
+        for number, data in enumerate(csv.DictReader(lines), start=1):
+            yield number, data, None
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield number, None, {'non_field_errors': [f'Invalid JSON: {exc}']}
+            continue
+        if not isinstance(data, dict):
+            yield number, None, {'non_field_errors': ['Expected a JSON object']}
+        else:
+            yield number, data, None
+
+
+def import_talents(rows, chunk_size=1000):
+    """Validate and upsert talents on email, one chunk of rows at a time.
+
+    ``rows`` is what ``parse_rows`` yields. Memory use is bounded by ``chunk_size`` whatever the input size,
+    apart from the error report.
+    """
+
+    report = {'created': 0, 'updated': 0, 'errors': []}
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return report
+
+        valid = {}
+        errors = []
+        for number, data, error in chunk:
+            if error is None:
+                serializer = TalentSerializer(data=data)
+                if serializer.is_valid():
+                    email = serializer.validated_data['email']
+                    if email in valid:
+                        # The last row for an email wins, like it would across chunks.
+                        duplicate = valid[email][0]
+                        errors.append({'row': duplicate, 'errors': {'email': [f'Replaced by row {number}']}})
+                    valid[email] = number, serializer.validated_data
+                    continue
+                error = serializer.errors
+            errors.append({'row': number, 'errors': error})
+        report['errors'].extend(sorted(errors, key=lambda error: error['row']))
+
+        created, updated = _upsert_chunk({email: data for email, (_, data) in valid.items()})
+        report['created'] += created
+        report['updated'] += updated
+
+
+def _upsert_chunk(rows_by_email, attempts=3):
+    """Update the talents of known emails and create the others.
+
+    A talent created concurrently for one of the emails, by another import or ``TalentCreate``, makes the insert
+    hit ``unique_talent_email``. The chunk is then upserted again, updating that talent instead.
+    """
+
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic():
+                existing, new = _upsert(rows_by_email)
+            break
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
+
+    cache.invalidate_many(Talent, [talent.pk for talent in existing])
+    return len(new), len(existing)
+
+
+def _upsert(rows_by_email):
+    fields = [field for field in TalentSerializer.Meta.fields if field != 'email']
+    existing = list(Talent.objects.filter(email__in=rows_by_email.keys()))
+    now = timezone.now()
+    for talent in existing:
+        for field in fields:
+            setattr(talent, field, rows_by_email[talent.email][field])
+        # bulk_update neither fires signals nor touches auto_now fields.
+        talent.updated_at = now
+
+    known = {talent.email for talent in existing}
+    new = [Talent(**data) for email, data in rows_by_email.items() if email not in known]
+    Talent.objects.bulk_update(existing, fields + ['updated_at'])
+    Talent.objects.bulk_create(new)
+    return existing, new
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from casting_app.exports import FORMATS, export_rows, render
+
+
+class Command(BaseCommand):
+    help = 'Stream the applications of a project or a company as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument('--project', type=int)
+        scope.add_argument('--company', type=int)
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help='File to write, defaults to standard output.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = export_rows(options['project'], options['company'], options['chunk_size'])
+        lines = render(rows, options['format'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        try:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(lines)
+        except OSError as exc:
+            raise CommandError(exc)
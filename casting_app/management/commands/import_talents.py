@@ -0,0 +1,28 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from casting_app.importers import FORMATS, import_talents, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream talents from a CSV or NDJSON file and upsert them on email.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, "-" reads standard input.')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if file_format not in FORMATS:
+            raise CommandError('Pass --format csv or --format ndjson')
+
+        if options['path'] == '-':
+            report = import_talents(parse_rows(sys.stdin, file_format), options['chunk_size'])
+        else:
+            with open(options['path'], newline='', encoding='utf-8') as lines:
+                report = import_talents(parse_rows(lines, file_format), options['chunk_size'])
+
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+
+from casting_app.application_queue import (
+    claim_tickets,
+    drain,
+    process_tickets,
+    release_stale_tickets,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert queued applications in batches. Start several of these processes for a pool of workers, '
+        'they never claim the same ticket.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Tickets claimed at once, 1000 at most.')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep on an empty queue.')
+        parser.add_argument(
+            '--stale-timeout', type=int, default=300, help='Requeue tickets claimed this many seconds ago.'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if not 0 < batch_size <= 1000:
+            raise CommandError('--batch-size must be between 1 and 1000')
+
+        if options['once']:
+            release_stale_tickets(options['stale_timeout'])
+            processed = drain(batch_size)
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} tickets'))
+            return
+
+        while True:
+            # Like a request would, drop connections past CONN_MAX_AGE or broken by a database restart.
+            close_old_connections()
+            try:
+                processed = self.work(batch_size, options['stale_timeout'])
+            except DatabaseError as exc:
+                self.stderr.write(f'Database error, retrying: {exc}')
+                processed = False
+            if not processed:
+                time.sleep(options['poll_interval'])
+
+    def work(self, batch_size, stale_timeout):
+        """Requeue stale tickets and process one batch, returning whether there was one."""
+
+        released = release_stale_tickets(stale_timeout)
+        if released:
+            self.stdout.write(f'Requeued {released} stale tickets')
+        tickets = claim_tickets(batch_size)
+        if not tickets:
+            return False
+        results = process_tickets(tickets)
+        accepted = sum(result['status'] == 'accepted' for result in results)
+        self.stdout.write(f'Processed {len(results)} of {len(tickets)} tickets, {accepted} accepted')
+        return True
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from casting_app.capacity import recount_applications
+from casting_app.stats import rebuild_role_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-role applicant statistics and application counters from the applications table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', type=int, action='append', dest='roles', help='Only rebuild this role.')
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_role_stats(options['roles'])
+        recount_applications(options['roles'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt statistics of {rebuilt} roles'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from casting_app.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every role.'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Rebuilt the role search index'))
@@ -0,0 +1,130 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from casting_app import geo
+from casting_app.capacity import recount_applications
+from casting_app.matching import application_snapshot
+from casting_app.models import Application, Company, Project, Role, RoleTrait, Talent
+from casting_app.search import rebuild_index
+from casting_app.stats import rebuild_role_stats
+
+GENDERS = ['male', 'female']
+ETHNICITIES = ['white', 'black', 'asian', 'hispanic', 'arab']
+CITIES = ['Cairo', 'Alexandria', 'Giza', 'Luxor', 'Aswan', 'Dubai', 'London', 'Paris', 'Berlin', 'Lagos']
+ROLE_NAMES = ['pilot', 'officer', 'doctor', 'nurse', 'teacher', 'driver', 'chef', 'dancer', 'singer', 'guard']
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic companies, projects, roles, talents and applications for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--companies', type=int, default=10)
+        parser.add_argument('--projects', type=int, default=10, help='Projects per company.')
+        parser.add_argument('--roles', type=int, default=10, help='Roles per project.')
+        parser.add_argument('--talents', type=int, default=10000)
+        parser.add_argument('--applications', type=int, default=20, help='Applications per role.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])  # nosec B311 - synthetic data
+        batch_size = options['batch_size']
+        # Offset names and emails so several runs can be seeded into the same database.
+        offset = Talent.objects.count()
+        company_offset = Company.objects.count()
+
+        with transaction.atomic():
+            Company.objects.bulk_create(
+                Company(name=f'Company {index}', email=f'company{index}@bench.test', description='Benchmark company')
+                for index in range(company_offset, company_offset + options['companies'])
+            )
+            companies = list(Company.objects.order_by('-id')[: options['companies']])
+
+            projects = [
+                Project(
+                    company=company,
+                    name=f'{company.name} project {index}',
+                    description='Benchmark project',
+                    location=rng.choice(CITIES),
+                )
+                for company in companies
+                for index in range(options['projects'])
+            ]
+            for project in projects:
+                # bulk_create skips Project.save, geocode here and spread projects around their city.
+                latitude, longitude = geo.geocode(project.location)
+                project.latitude = latitude + rng.uniform(-0.2, 0.2)
+                project.longitude = longitude + rng.uniform(-0.2, 0.2)
+                project.geocode()
+            Project.objects.bulk_create(projects, batch_size=batch_size)
+            projects = list(Project.objects.filter(company__in=companies))
+
+            roles = [
+                Role(
+                    name=f'{rng.choice(ROLE_NAMES)} {index}',
+                    project=project,
+                    talent_age=rng.randint(18, 60),
+                    talent_gender=rng.choice(GENDERS),
+                    talent_ethnicity=rng.choice(ETHNICITIES),
+                    talent_weight=rng.randint(50, 100),
+                    talent_height=rng.randint(150, 200),
+                )
+                for project in projects
+                for index in range(options['roles'])
+            ]
+            for role in roles:
+                role.fill_ranges(tolerance=rng.choice([3, 5, 10]))
+            Role.objects.bulk_create(roles, batch_size=batch_size)
+
+            roles = list(Role.objects.filter(project__in=projects))
+            role_ids = [role.pk for role in roles]
+            # bulk_create skips Role.save, add the target traits and sometimes a second accepted ethnicity.
+            traits = [trait for role in roles for trait in role.target_traits()]
+            traits += [
+                RoleTrait(role=role, trait=RoleTrait.ETHNICITY, value=rng.choice(ETHNICITIES))
+                for role in roles
+                if rng.random() < 0.3
+            ]
+            RoleTrait.objects.bulk_create(traits, batch_size=batch_size, ignore_conflicts=True)
+            roles = list(Role.objects.filter(project__in=projects).prefetch_related('traits'))
+
+            Talent.objects.bulk_create(
+                (
+                    Talent(
+                        name=f'Talent {index}',
+                        email=f'talent{index}@bench.test',
+                        phone_number=f'+20100{index:07d}',
+                        age=rng.randint(18, 60),
+                        gender=rng.choice(GENDERS),
+                        ethnicity=rng.choice(ETHNICITIES),
+                        weight=round(rng.uniform(50, 100), 1),
+                        height=round(rng.uniform(150, 200), 1),
+                    )
+                    for index in range(offset, offset + options['talents'])
+                ),
+                batch_size=batch_size,
+            )
+            talents = list(Talent.objects.order_by('-id')[: options['talents']])
+
+            per_role = min(options['applications'], len(talents))
+            Application.objects.bulk_create(
+                (
+                    Application(talent=talent, role=role, **application_snapshot(talent, role))
+                    for role in roles
+                    for talent in rng.sample(talents, per_role)
+                ),
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+            rebuild_role_stats(role_ids)
+            recount_applications(role_ids)
+            rebuild_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Seeded {len(companies)} companies, {len(projects)} projects, {len(role_ids)} roles, '
+                f'{len(talents)} talents and {len(role_ids) * per_role} applications'
+            )
+        )
@@ -0,0 +1,83 @@
+from .models import Role, RoleTrait, Talent
+
+CRITERIA = ('gender', 'ethnicity', 'age', 'weight', 'height')
+TRAITS = ('gender', 'ethnicity')
+MEASUREMENTS = Role.MEASUREMENTS
+
+
+def unsatisfied_criteria(talent, role):
+    """Return the names of the role criteria the talent does not satisfy.
+
+    Set lookups and range comparisons only; ``role.traits`` should be prefetched, as the cache does.
+    """
+
+    errors = [trait for trait in TRAITS if getattr(talent, trait) not in role.accepted(trait)]
+    for attribute in MEASUREMENTS:
+        if not getattr(role, f'{attribute}_min') <= getattr(talent, attribute) <= getattr(role, f'{attribute}_max'):
+            errors.append(attribute)
+    return errors
+
+
+def match_score(talent, role):
+    """Closeness of the talent's measurements to the role's targets, 1 for a perfect match.
+
+    Each deviation is scaled by the distance from the target to the range bound on the same side, and the three
+    are averaged, so the score falls to 0 when every measurement sits on a bound of its range.
+    """
+
+    deviation = 0
+    for attribute in MEASUREMENTS:
+        value, target = getattr(talent, attribute), getattr(role, f'talent_{attribute}')
+        bound = getattr(role, f'{attribute}_max' if value >= target else f'{attribute}_min')
+        deviation += abs(value - target) / abs(bound - target) if bound != target else 0
+    return round(1 - deviation / len(MEASUREMENTS), 4)
+
+
+def application_snapshot(talent, role):
+    """Application fields freezing the role criteria and talent attributes a decision was made on.
+
+    Role criteria hold the accepted values of each trait and ``[min, target, max]`` of each measurement.
+    """
+
+    criteria = {trait: sorted(role.accepted(trait)) for trait in TRAITS}
+    for attribute in MEASUREMENTS:
+        criteria[attribute] = [
+            getattr(role, f'{attribute}_min'),
+            getattr(role, f'talent_{attribute}'),
+            getattr(role, f'{attribute}_max'),
+        ]
+    return {
+        'role_criteria': criteria,
+        'talent_attributes': {attribute: getattr(talent, attribute) for attribute in CRITERIA},
+        'match_score': match_score(talent, role),
+    }
+
+
+def eligible_roles(talent):
+    """Roles whose criteria the talent satisfies, joining the trait index with the role ranges."""
+
+    return (
+        Role.objects.filter(traits__trait=RoleTrait.GENDER, traits__value=talent.gender)
+        .filter(traits__trait=RoleTrait.ETHNICITY, traits__value=talent.ethnicity)
+        .filter(
+            age_min__lte=talent.age,
+            age_max__gte=talent.age,
+            weight_min__lte=talent.weight,
+            weight_max__gte=talent.weight,
+            height_min__lte=talent.height,
+            height_max__gte=talent.height,
+        )
+        .order_by('id')
+    )
+
+
+def eligible_talents(role):
+    """Talents satisfying the role criteria, as a single indexed range query."""
+
+    return Talent.objects.filter(
+        gender__in=role.accepted(RoleTrait.GENDER),
+        ethnicity__in=role.accepted(RoleTrait.ETHNICITY),
+        age__range=(role.age_min, role.age_max),
+        weight__range=(role.weight_min, role.weight_max),
+        height__range=(role.height_min, role.height_max),
+    ).order_by('id')
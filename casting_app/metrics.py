@@ -0,0 +1,188 @@
+"""Per-view request metrics exposed in the Prometheus text format on ``/metrics``.
+
+Metrics live in the memory of each process: with several gunicorn workers every scrape reads the worker that
+answered it, so scrape the workers individually or run a single worker per container.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from . import cache
+
+logger = logging.getLogger('casting_app.slow_requests')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """A Prometheus histogram with one series per view."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, view, value):
+        with self.lock:
+            counts, total = self.series.get(view, ([0] * (len(self.buckets) + 1), 0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[view] = (counts, total + value)
+
+    def expose(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted((view, list(counts), total) for view, (counts, total) in self.series.items())
+        for view, counts, total in series:
+            label = f'view="{_escape(view)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label}}} {total}')
+            lines.append(f'{self.name}_count{{{label}}} {cumulative}')
+        return lines
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_duration = Histogram('casting_request_duration_seconds', 'Request latency per view.', LATENCY_BUCKETS)
+request_queries = Histogram('casting_request_queries', 'SQL queries issued per request.', QUERY_COUNT_BUCKETS)
+request_query_duration = Histogram(
+    'casting_request_query_duration_seconds', 'Time spent in SQL queries per request.', LATENCY_BUCKETS
+)
+# DRF serializers build ``.data`` inside the view, so their time counts towards the request latency, not this.
+render_duration = Histogram(
+    'casting_render_duration_seconds',
+    'Time spent encoding response bodies per request, serializer time excluded.',
+    LATENCY_BUCKETS,
+)
+HISTOGRAMS = (request_duration, request_queries, request_query_duration, render_duration)
+
+
+class QueryRecorder:
+    """Database execute wrapper counting and timing queries, optionally keeping their SQL."""
+
+    def __init__(self, capture=False):
+        self.capture = capture
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.capture:
+                self.queries.append((elapsed, sql))
+
+
+class MetricsMiddleware:
+    """Record latency, SQL queries and rendering time of every request per view.
+
+    The middleware runs in async mode under ASGI. Queries then run on executor threads whose connections it cannot
+    wrap, so only latency and rendering time are recorded.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Tells Django this instance is a coroutine function, as MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder(capture=settings.SLOW_REQUEST_SECONDS is not None)
+        request._render_duration = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        self.record(request, time.perf_counter() - started, recorder)
+        return response
+
+    async def __acall__(self, request):
+        request._render_duration = 0.0
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.record(request, time.perf_counter() - started)
+        return response
+
+    def record(self, request, duration, recorder=None):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else 'unresolved'
+        request_duration.observe(view, duration)
+        render_duration.observe(view, request._render_duration)
+        if recorder is not None:
+            request_queries.observe(view, recorder.count)
+            request_query_duration.observe(view, recorder.duration)
+
+        threshold = settings.SLOW_REQUEST_SECONDS
+        if threshold is None or duration < threshold:
+            return
+        if recorder is None:
+            logger.warning('Slow request %s %s (%s) took %.3fs', request.method, request.path, view, duration)
+            return
+        logger.warning(
+            'Slow request %s %s (%s) took %.3fs with %d queries (%.3fs):\n%s',
+            request.method,
+            request.path,
+            view,
+            duration,
+            recorder.count,
+            recorder.duration,
+            '\n'.join(f'  [{elapsed:.4f}s] {sql}' for elapsed, sql in recorder.queries),
+        )
+
+    def process_template_response(self, request, response):
+        """DRF responses are rendered after the view returns, time it through a post-render callback."""
+
+        started = time.perf_counter()
+
+        def record(rendered):
+            request._render_duration += time.perf_counter() - started
+
+        response.add_post_render_callback(record)
+        return response
+
+
+def expose():
+    """All metrics in the Prometheus text exposition format."""
+
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    stats = cache.cache_stats()
+    for outcome in ('hits', 'misses'):
+        name = f'casting_cache_{outcome}_total'
+        lines.extend([f'# HELP {name} Talent and role cache {outcome}.', f'# TYPE {name} counter'])
+        lines.extend(f'{name}{{model="{model}"}} {counters[outcome]}' for model, counters in sorted(stats.items()))
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Serve the metrics of this process to a Prometheus scraper or a curious human."""
+
+    return HttpResponse(expose(), content_type='text/plain; version=0.0.4; charset=utf-8')
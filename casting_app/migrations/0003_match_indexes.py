@@ -0,0 +1,27 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0002_add_company_to_project'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='project',
+            name='company',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, to='casting_app.company'),
+        ),
+        migrations.AddIndex(
+            model_name='role',
+            index=models.Index(fields=['talent_gender', 'talent_ethnicity', 'talent_age'], name='role_match_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talent',
+            index=models.Index(fields=['gender', 'ethnicity', 'age'], name='talent_match_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0003_match_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['role', 'datetime_applied'], name='application_role_date_idx'),
+        ),
+    ]
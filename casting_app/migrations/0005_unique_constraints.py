@@ -0,0 +1,37 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0004_application_role_date_index'),
+    ]
+
+    operations = [
+        # Functional unique constraints need Django 4.0, so the case-insensitive index is created by hand.
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX unique_project_name_ci ON casting_app_project (LOWER(name));',
+            reverse_sql='DROP INDEX unique_project_name_ci;',
+        ),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(fields=('talent', 'role'), name='unique_application'),
+        ),
+        migrations.AddConstraint(
+            model_name='role',
+            constraint=models.UniqueConstraint(
+                fields=(
+                    'project',
+                    'name',
+                    'talent_age',
+                    'talent_gender',
+                    'talent_ethnicity',
+                    'talent_weight',
+                    'talent_height',
+                ),
+                name='unique_role_criteria',
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0006_add_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='talent',
+            index=models.Index(fields=['gender', 'height'], name='talent_gender_height_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talent',
+            index=models.Index(fields=['gender', 'weight'], name='talent_gender_weight_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talent',
+            index=models.Index(fields=['age'], name='talent_age_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talent',
+            index=models.Index(fields=['height'], name='talent_height_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='talent',
+            index=models.Index(fields=['weight'], name='talent_weight_idx'),
+        ),
+    ]
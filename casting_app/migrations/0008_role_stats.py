@@ -0,0 +1,43 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0007_talent_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoleStats',
+            fields=[
+                (
+                    'role',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='stats',
+                        serialize=False,
+                        to='casting_app.role',
+                    ),
+                ),
+                ('applicant_count', models.PositiveIntegerField(default=0)),
+                ('age_sum', models.FloatField(default=0)),
+                ('age_min', models.FloatField(null=True)),
+                ('age_max', models.FloatField(null=True)),
+                ('age_histogram', models.JSONField(default=dict)),
+                ('height_sum', models.FloatField(default=0)),
+                ('height_min', models.FloatField(null=True)),
+                ('height_max', models.FloatField(null=True)),
+                ('height_histogram', models.JSONField(default=dict)),
+                ('weight_sum', models.FloatField(default=0)),
+                ('weight_min', models.FloatField(null=True)),
+                ('weight_max', models.FloatField(null=True)),
+                ('weight_histogram', models.JSONField(default=dict)),
+                ('daily_applications', models.JSONField(default=dict)),
+            ],
+        ),
+    ]
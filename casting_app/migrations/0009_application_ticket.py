@@ -0,0 +1,45 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0008_role_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('pending', 'pending'),
+                            ('processing', 'processing'),
+                            ('accepted', 'accepted'),
+                            ('declined', 'declined'),
+                            ('invalid', 'invalid'),
+                        ],
+                        default='pending',
+                        max_length=20,
+                    ),
+                ),
+                ('errors', models.JSONField(blank=True, null=True)),
+                ('claim', models.UUIDField(blank=True, null=True)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('role', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='casting_app.role')),
+                ('talent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='casting_app.talent')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='applicationticket',
+            index=models.Index(fields=['status', 'id'], name='ticket_status_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0009_application_ticket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='match_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='role_criteria',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='talent_attributes',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
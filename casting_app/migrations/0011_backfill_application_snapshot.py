@@ -0,0 +1,45 @@
+from django.db import migrations, transaction
+
+# Frozen copies of casting_app.matching as of this migration, later changes to matching must not alter the backfill.
+TOLERANCE = 5
+CRITERIA = ('gender', 'ethnicity', 'age', 'weight', 'height')
+MEASUREMENTS = ('age', 'weight', 'height')
+BATCH_SIZE = 1000
+
+
+def backfill_snapshots(apps, schema_editor):
+    """Snapshot existing applications batch after batch, each batch committed on its own."""
+
+    Application = apps.get_model('casting_app', 'Application')
+    last_id = 0
+    while True:
+        batch = list(
+            Application.objects.filter(id__gt=last_id, match_score__isnull=True)
+            .select_related('talent', 'role')
+            .order_by('id')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        for application in batch:
+            talent, role = application.talent, application.role
+            application.role_criteria = {attribute: getattr(role, f'talent_{attribute}') for attribute in CRITERIA}
+            application.talent_attributes = {attribute: getattr(talent, attribute) for attribute in CRITERIA}
+            deviation = sum(abs(getattr(talent, field) - getattr(role, f'talent_{field}')) for field in MEASUREMENTS)
+            application.match_score = round(1 - deviation / (TOLERANCE * len(MEASUREMENTS)), 4)
+        with transaction.atomic():
+            Application.objects.bulk_update(batch, ['role_criteria', 'talent_attributes', 'match_score'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    # Commit batch by batch so an interrupted backfill resumes where it stopped.
+    atomic = False
+
+    dependencies = [
+        ('casting_app', '0010_application_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
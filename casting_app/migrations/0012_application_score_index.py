@@ -0,0 +1,17 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0011_backfill_application_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['role', 'match_score', 'id'], name='application_role_score_idx'),
+        ),
+    ]
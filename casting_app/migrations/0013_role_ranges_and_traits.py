@@ -0,0 +1,75 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0012_application_score_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoleTrait',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trait', models.CharField(choices=[('gender', 'gender'), ('ethnicity', 'ethnicity')], max_length=20)),
+                ('value', models.CharField(max_length=50)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='role',
+            name='role_match_idx',
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='age_max',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='age_min',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='height_max',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='height_min',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='weight_max',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='weight_min',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='role',
+            index=models.Index(fields=['age_min', 'age_max'], name='role_age_range_idx'),
+        ),
+        migrations.AddField(
+            model_name='roletrait',
+            name='role',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, related_name='traits', to='casting_app.role'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='roletrait',
+            index=models.Index(fields=['trait', 'value', 'role'], name='role_trait_value_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='roletrait',
+            constraint=models.UniqueConstraint(fields=('role', 'trait', 'value'), name='unique_role_trait'),
+        ),
+    ]
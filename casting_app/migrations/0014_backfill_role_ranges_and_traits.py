@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# The tolerance every role was matched with until ranges became configurable.
+TOLERANCE = 5
+MEASUREMENTS = ('age', 'weight', 'height')
+BATCH_SIZE = 1000
+
+
+def backfill_ranges_and_traits(apps, schema_editor):
+    """Give existing roles their former ±5 ranges and accept their target gender and ethnicity."""
+
+    Role = apps.get_model('casting_app', 'Role')
+    RoleTrait = apps.get_model('casting_app', 'RoleTrait')
+    fields = [f'{attribute}_{bound}' for attribute in MEASUREMENTS for bound in ('min', 'max')]
+    last_id = 0
+    while True:
+        batch = list(Role.objects.filter(id__gt=last_id).order_by('id')[:BATCH_SIZE])
+        if not batch:
+            return
+        traits = []
+        for role in batch:
+            for attribute in MEASUREMENTS:
+                target = getattr(role, f'talent_{attribute}')
+                setattr(role, f'{attribute}_min', target - TOLERANCE)
+                setattr(role, f'{attribute}_max', target + TOLERANCE)
+            traits.append(RoleTrait(role=role, trait='gender', value=role.talent_gender))
+            traits.append(RoleTrait(role=role, trait='ethnicity', value=role.talent_ethnicity))
+        Role.objects.bulk_update(batch, fields)
+        RoleTrait.objects.bulk_create(traits, ignore_conflicts=True)
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0013_role_ranges_and_traits'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ranges_and_traits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0014_backfill_role_ranges_and_traits'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='role',
+            name='age_max',
+            field=models.FloatField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='role',
+            name='age_min',
+            field=models.FloatField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='role',
+            name='height_max',
+            field=models.FloatField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='role',
+            name='height_min',
+            field=models.FloatField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='role',
+            name='weight_max',
+            field=models.FloatField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='role',
+            name='weight_min',
+            field=models.FloatField(blank=True),
+        ),
+    ]
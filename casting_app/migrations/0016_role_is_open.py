@@ -0,0 +1,18 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0015_role_ranges_not_null'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='role',
+            name='is_open',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE casting_app_role_search USING fts5("
+    "role_name, project_name, location, description, tokenize = 'porter unicode61 remove_diacritics 2')",
+    'INSERT INTO casting_app_role_search (rowid, role_name, project_name, location, description) '
+    'SELECT r.id, r.name, p.name, p.location, p.description '
+    'FROM casting_app_role r JOIN casting_app_project p ON p.id = r.project_id',
+]
+POSTGRESQL_CREATE = [
+    'CREATE TABLE casting_app_role_search ('
+    'role_id bigint PRIMARY KEY REFERENCES casting_app_role (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+    'document tsvector NOT NULL)',
+    'CREATE INDEX casting_app_role_search_document_idx ON casting_app_role_search USING GIN (document)',
+    'INSERT INTO casting_app_role_search (role_id, document) '
+    "SELECT r.id, setweight(to_tsvector('english', r.name), 'A') "
+    "|| setweight(to_tsvector('english', p.name), 'B') "
+    "|| setweight(to_tsvector('english', p.location), 'C') "
+    "|| setweight(to_tsvector('english', p.description), 'D') "
+    'FROM casting_app_role r JOIN casting_app_project p ON p.id = r.project_id',
+]
+
+
+def create_search_table(apps, schema_editor):
+    """The text index only exists in raw SQL, FTS5 on SQLite and tsvector with GIN on PostgreSQL."""
+
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    for sql in SQLITE_CREATE if vendor == 'sqlite' else POSTGRESQL_CREATE:
+        schema_editor.execute(sql)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE casting_app_role_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0016_role_is_open'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0017_role_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        # SQLite adds columns by rebuilding the table, which drops the raw SQL index of migration 0005.
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX IF NOT EXISTS unique_project_name_ci ON casting_app_project (LOWER(name));',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
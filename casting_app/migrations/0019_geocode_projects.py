@@ -0,0 +1,36 @@
+from django.db import migrations
+
+from casting_app import geo
+
+BATCH_SIZE = 1000
+
+
+def geocode_projects(apps, schema_editor):
+    """Geocode existing projects from the gazetteer, the historical model has no ``save()`` logic."""
+
+    Project = apps.get_model('casting_app', 'Project')
+    last_id = 0
+    while True:
+        batch = list(Project.objects.filter(id__gt=last_id).order_by('id')[:BATCH_SIZE])
+        if not batch:
+            return
+        located = []
+        for project in batch:
+            coordinates = geo.geocode(project.location)
+            if coordinates is not None:
+                project.latitude, project.longitude = coordinates
+                project.geohash = geo.encode(*coordinates)
+                located.append(project)
+        Project.objects.bulk_update(located, ['latitude', 'longitude', 'geohash'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0018_project_coordinates'),
+    ]
+
+    operations = [
+        migrations.RunPython(geocode_projects, migrations.RunPython.noop),
+    ]
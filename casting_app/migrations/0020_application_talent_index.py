@@ -0,0 +1,17 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0019_geocode_projects'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['talent', 'datetime_applied'], name='application_talent_date_idx'),
+        ),
+    ]
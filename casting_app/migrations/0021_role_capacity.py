@@ -0,0 +1,23 @@
+# Generated by Django 3.2.14 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0020_application_talent_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='role',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='role',
+            name='max_applications',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_applications(apps, schema_editor):
+    """Start the counters of existing roles from their applications, in a single UPDATE."""
+
+    Role = apps.get_model('casting_app', 'Role')
+    Application = apps.get_model('casting_app', 'Application')
+    counts = (
+        Application.objects.filter(role_id=OuterRef('pk'))
+        .order_by()
+        .values('role_id')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Role.objects.update(application_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0021_role_capacity'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_applications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0022_count_role_applications'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='application',
+            name='application_talent_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['talent', 'datetime_applied', 'id'], name='application_talent_date_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count, F, Min
+
+
+def merge_duplicate_talents(apps, schema_editor):
+    """Keep the oldest talent of each email, moving the others' applications and tickets over to it.
+
+    Applications of a duplicate for a role the kept talent applied to already are deleted and uncounted from their
+    role. Run ``rebuild_role_stats`` afterwards when any talent was merged.
+    """
+
+    Talent = apps.get_model('casting_app', 'Talent')
+    Application = apps.get_model('casting_app', 'Application')
+    ApplicationTicket = apps.get_model('casting_app', 'ApplicationTicket')
+    Role = apps.get_model('casting_app', 'Role')
+
+    duplicates = (
+        Talent.objects.order_by().values('email').annotate(count=Count('id'), keep=Min('id')).filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        keep = duplicate['keep']
+        others = list(Talent.objects.filter(email=duplicate['email']).exclude(id=keep).values_list('id', flat=True))
+        for other in others:
+            applied = Application.objects.filter(talent_id=keep).values('role_id')
+            Application.objects.filter(talent_id=other).exclude(role_id__in=applied).update(talent_id=keep)
+        dropped = Application.objects.filter(talent_id__in=others)
+        for role_id, count in dropped.order_by().values_list('role_id').annotate(count=Count('id')):
+            Role.objects.filter(id=role_id).update(application_count=F('application_count') - count)
+        dropped.delete()
+        ApplicationTicket.objects.filter(talent_id__in=others).update(talent_id=keep)
+        Talent.objects.filter(id__in=others).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0023_application_talent_index_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_talents, migrations.RunPython.noop),
+    ]
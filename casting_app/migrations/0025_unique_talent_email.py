@@ -0,0 +1,22 @@
+# Generated by Django 3.2.14 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casting_app', '0024_merge_duplicate_talents'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='talent',
+            name='email',
+            field=models.EmailField(max_length=254),
+        ),
+        migrations.AddConstraint(
+            model_name='talent',
+            constraint=models.UniqueConstraint(fields=('email',), name='unique_talent_email'),
+        ),
+    ]
@@ -1,18 +1,38 @@
+from functools import reduce
+from operator import or_
+
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q
+
+from . import geo
 
 
 class Talent(models.Model):
-    """A model representing a talent."""
+    """A model representing a talent, identified by their email."""
 
     name = models.CharField(max_length=50)
-    email = models.EmailField(db_index=True)
+    email = models.EmailField()
     phone_number = models.CharField(max_length=50)
     age = models.IntegerField()
     gender = models.CharField(max_length=50)
     ethnicity = models.CharField(max_length=50)
     weight = models.FloatField()
     height = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['gender', 'ethnicity', 'age'], name='talent_match_idx'),
+            models.Index(fields=['gender', 'height'], name='talent_gender_height_idx'),
+            models.Index(fields=['gender', 'weight'], name='talent_gender_weight_idx'),
+            models.Index(fields=['age'], name='talent_age_idx'),
+            models.Index(fields=['height'], name='talent_height_idx'),
+            models.Index(fields=['weight'], name='talent_weight_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['email'], name='unique_talent_email'),
+        ]
 
     def __str__(self):
         """String representation of the talent."""
@@ -34,15 +54,51 @@ class Company(models.Model):
 
 
 class Project(models.Model):
-    """A model representing a project."""
+    """A model representing a project.
+
+    Names are unique case-insensitively through the ``unique_project_name_ci`` index created in migration 0005.
+    Locations found in the gazetteer are geocoded on save, see ``casting_app.geo``.
+    """
 
     company = models.ForeignKey(Company, on_delete=models.PROTECT, null=True)
     name = models.CharField(max_length=50)
     description = models.TextField()
     location = models.CharField(max_length=50)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, db_index=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        project = super().from_db(db, field_names, values)
+        # Location and coordinates as loaded, so geocode() can tell whether the project moved.
+        project._loaded_values = dict(zip(field_names, values))
+        return project
+
+    def save(self, *args, **kwargs):
+        self.geocode()
+        super().save(*args, **kwargs)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+    def geocode(self):
+        """Look the location up in the gazetteer unless coordinates are given, and bucket them by geohash.
+
+        A new location is looked up again unless new coordinates come with it.
+        """
+
+        loaded = getattr(self, '_loaded_values', {})
+        moved = loaded.get('location', self.location) != self.location
+        kept = (loaded.get('latitude'), loaded.get('longitude')) == (self.latitude, self.longitude)
+        if self.latitude is None or self.longitude is None or (moved and kept):
+            self.latitude, self.longitude = geo.geocode(self.location) or (None, None)
+        self.geohash = geo.encode(self.latitude, self.longitude) if self.latitude is not None else ''
 
     def get_roles(self):
-        return Role.objects.filter(project=self).values_list('name', flat=True)
+        """Names of the project roles, read from ``role_set`` when it was prefetched."""
+
+        if 'role_set' in getattr(self, '_prefetched_objects_cache', {}):
+            return [role.name for role in self.role_set.all()]
+        return list(Role.objects.filter(project=self).order_by('id').values_list('name', flat=True))
 
     def __str__(self):
         """String representation of the project."""
@@ -51,7 +107,15 @@ class Project(models.Model):
 
 
 class Role(models.Model):
-    """A model representing a role assigned to a project."""
+    """A model representing a role assigned to a project.
+
+    Talents qualify when their age, weight and height fall within the role's ranges, which default to the targets
+    plus or minus ``DEFAULT_TOLERANCE``, and their gender and ethnicity are among the accepted ``traits``.
+    Roles with ``max_applications`` close once ``application_count`` reaches it, see ``casting_app.capacity``.
+    """
+
+    DEFAULT_TOLERANCE = 5
+    MEASUREMENTS = ('age', 'weight', 'height')
 
     name = models.CharField(max_length=100)
     project = models.ForeignKey(Project, on_delete=models.PROTECT)
@@ -60,6 +124,116 @@ class Role(models.Model):
     talent_ethnicity = models.CharField(max_length=50)
     talent_weight = models.FloatField()
     talent_height = models.FloatField()
+    age_min = models.FloatField(blank=True)
+    age_max = models.FloatField(blank=True)
+    weight_min = models.FloatField(blank=True)
+    weight_max = models.FloatField(blank=True)
+    height_min = models.FloatField(blank=True)
+    height_max = models.FloatField(blank=True)
+    is_open = models.BooleanField(default=True)
+    max_applications = models.PositiveIntegerField(null=True, blank=True)
+    application_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['age_min', 'age_max'], name='role_age_range_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'project',
+                    'name',
+                    'talent_age',
+                    'talent_gender',
+                    'talent_ethnicity',
+                    'talent_weight',
+                    'talent_height',
+                ],
+                name='unique_role_criteria',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        role = super().from_db(db, field_names, values)
+        # Targets and ranges as loaded, so save() can tell what changed.
+        role._loaded_values = dict(zip(field_names, values))
+        return role
+
+    def save(self, *args, **kwargs):
+        """Fill in missing ranges and make sure the target gender and ethnicity are accepted.
+
+        When a target changes, ranges left as loaded move along with it and a replaced target gender or
+        ethnicity is no longer accepted.
+        """
+
+        adding = self._state.adding
+        loaded = {} if adding else getattr(self, '_loaded_values', {})
+        self.follow_targets(loaded)
+        self.fill_ranges()
+        if adding and self.is_full:
+            self.is_open = False
+        if not adding and not args and kwargs.get('update_fields') is None:
+            # The counter only moves through casting_app.capacity, a stale copy must never overwrite it.
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'application_count'
+            ]
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if not adding and self.max_applications is not None:
+                # A copy loaded before the counter filled the role must not reopen it.
+                full = Role.objects.filter(pk=self.pk, is_open=True, application_count__gte=F('max_applications'))
+                if full.update(is_open=False):
+                    self.is_open = False
+            replaced = [
+                Q(trait=trait, value=loaded[f'talent_{trait}'])
+                for trait in (RoleTrait.GENDER, RoleTrait.ETHNICITY)
+                if loaded.get(f'talent_{trait}', getattr(self, f'talent_{trait}')) != getattr(self, f'talent_{trait}')
+            ]
+            if replaced:
+                RoleTrait.objects.filter(reduce(or_, replaced), role=self).delete()
+            RoleTrait.objects.bulk_create(self.target_traits(), ignore_conflicts=True)
+        self._loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+    def follow_targets(self, loaded):
+        """Shift the bounds left as ``loaded`` by as much as their target moved since."""
+
+        for attribute in self.MEASUREMENTS:
+            previous = loaded.get(f'talent_{attribute}')
+            target = getattr(self, f'talent_{attribute}')
+            if previous is None or previous == target:
+                continue
+            for bound in (f'{attribute}_min', f'{attribute}_max'):
+                value = getattr(self, bound)
+                if value is not None and value == loaded.get(bound):
+                    setattr(self, bound, value + target - previous)
+
+    def target_traits(self):
+        return [
+            RoleTrait(role=self, trait=RoleTrait.GENDER, value=self.talent_gender),
+            RoleTrait(role=self, trait=RoleTrait.ETHNICITY, value=self.talent_ethnicity),
+        ]
+
+    def fill_ranges(self, tolerance=DEFAULT_TOLERANCE):
+        """Default the ranges left unset to the targets plus or minus ``tolerance``."""
+
+        for attribute in self.MEASUREMENTS:
+            target = getattr(self, f'talent_{attribute}')
+            if getattr(self, f'{attribute}_min') is None:
+                setattr(self, f'{attribute}_min', target - tolerance)
+            if getattr(self, f'{attribute}_max') is None:
+                setattr(self, f'{attribute}_max', target + tolerance)
+
+    @property
+    def is_full(self):
+        return self.max_applications is not None and self.application_count >= self.max_applications
+
+    def accepted(self, trait):
+        """The accepted genders or ethnicities, read from prefetched ``traits`` when available."""
+
+        return frozenset(role_trait.value for role_trait in self.traits.all() if role_trait.trait == trait)
 
     def __str__(self):
         """String representation of the role."""
@@ -67,9 +241,159 @@ class Role(models.Model):
         return f'{self.name} - {self.project.name}'
 
 
+class RoleTrait(models.Model):
+    """A gender or an ethnicity accepted by a role."""
+
+    GENDER = 'gender'
+    ETHNICITY = 'ethnicity'
+    TRAIT_CHOICES = [(GENDER, GENDER), (ETHNICITY, ETHNICITY)]
+
+    role = models.ForeignKey(Role, on_delete=models.CASCADE, related_name='traits')
+    trait = models.CharField(max_length=20, choices=TRAIT_CHOICES)
+    value = models.CharField(max_length=50)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['trait', 'value', 'role'], name='role_trait_value_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['role', 'trait', 'value'], name='unique_role_trait'),
+        ]
+
+    def __str__(self):
+        """String representation of the role trait."""
+
+        return f'{self.role_id} {self.trait}: {self.value}'
+
+
 class Application(models.Model):
     """A model representing an application for a role."""
 
     talent = models.ForeignKey(Talent, on_delete=models.PROTECT)
     role = models.ForeignKey(Role, on_delete=models.PROTECT)
     datetime_applied = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Snapshot taken at apply time, see casting_app.matching.application_snapshot.
+    role_criteria = models.JSONField(null=True, blank=True)
+    talent_attributes = models.JSONField(null=True, blank=True)
+    match_score = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['role', 'datetime_applied'], name='application_role_date_idx'),
+            models.Index(fields=['role', 'match_score', 'id'], name='application_role_score_idx'),
+            models.Index(fields=['talent', 'datetime_applied', 'id'], name='application_talent_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['talent', 'role'], name='unique_application'),
+        ]
+
+
+class ApplicationTicket(models.Model):
+    """An application waiting in the database-backed queue for a worker to insert it."""
+
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    ACCEPTED = 'accepted'
+    DECLINED = 'declined'
+    INVALID = 'invalid'
+    STATUS_CHOICES = [(status, status) for status in (PENDING, PROCESSING, ACCEPTED, DECLINED, INVALID)]
+
+    talent = models.ForeignKey(Talent, on_delete=models.CASCADE)
+    role = models.ForeignKey(Role, on_delete=models.CASCADE)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    errors = models.JSONField(null=True, blank=True)
+    claim = models.UUIDField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='ticket_status_idx'),
+        ]
+
+    def __str__(self):
+        """String representation of the ticket."""
+
+        return f'Ticket {self.pk} ({self.status})'
+
+
+class RoleStats(models.Model):
+    """Applicant statistics of a role, kept up to date as applications come in."""
+
+    DISTRIBUTION_ATTRIBUTES = ('age', 'height', 'weight')
+    HISTOGRAM_BUCKET = 5
+
+    role = models.OneToOneField(Role, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    applicant_count = models.PositiveIntegerField(default=0)
+    age_sum = models.FloatField(default=0)
+    age_min = models.FloatField(null=True)
+    age_max = models.FloatField(null=True)
+    age_histogram = models.JSONField(default=dict)
+    height_sum = models.FloatField(default=0)
+    height_min = models.FloatField(null=True)
+    height_max = models.FloatField(null=True)
+    height_histogram = models.JSONField(default=dict)
+    weight_sum = models.FloatField(default=0)
+    weight_min = models.FloatField(null=True)
+    weight_max = models.FloatField(null=True)
+    weight_histogram = models.JSONField(default=dict)
+    daily_applications = models.JSONField(default=dict)
+
+    def add_applicant(self, talent, applied_on):
+        """Account for one more applicant, ``applied_on`` being the date of the application."""
+
+        self.applicant_count += 1
+        for attribute in self.DISTRIBUTION_ATTRIBUTES:
+            value = getattr(talent, attribute)
+            setattr(self, f'{attribute}_sum', getattr(self, f'{attribute}_sum') + value)
+            low, high = getattr(self, f'{attribute}_min'), getattr(self, f'{attribute}_max')
+            setattr(self, f'{attribute}_min', value if low is None else min(low, value))
+            setattr(self, f'{attribute}_max', value if high is None else max(high, value))
+            histogram = getattr(self, f'{attribute}_histogram')
+            bucket = str(int(value // self.HISTOGRAM_BUCKET * self.HISTOGRAM_BUCKET))
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+        day = applied_on.isoformat()
+        self.daily_applications[day] = self.daily_applications.get(day, 0) + 1
+
+    def remove_applicant(self, talent, applied_on):
+        """Undo ``add_applicant``.
+
+        Returns whether the applicant held a minimum or a maximum, which then have to be recomputed from the
+        remaining applicants.
+        """
+
+        self.applicant_count -= 1
+        stale = False
+        for attribute in self.DISTRIBUTION_ATTRIBUTES:
+            value = getattr(talent, attribute)
+            setattr(self, f'{attribute}_sum', getattr(self, f'{attribute}_sum') - value)
+            stale = stale or value in (getattr(self, f'{attribute}_min'), getattr(self, f'{attribute}_max'))
+            histogram = getattr(self, f'{attribute}_histogram')
+            bucket = str(int(value // self.HISTOGRAM_BUCKET * self.HISTOGRAM_BUCKET))
+            self._decrement(histogram, bucket)
+        self._decrement(self.daily_applications, applied_on.isoformat())
+        return stale
+
+    @staticmethod
+    def _decrement(counts, key):
+        if counts.get(key, 0) > 1:
+            counts[key] -= 1
+        else:
+            counts.pop(key, None)
+
+    def distribution(self, attribute):
+        """Minimum, maximum, mean and histogram of an applicant attribute."""
+
+        return {
+            'min': getattr(self, f'{attribute}_min'),
+            'max': getattr(self, f'{attribute}_max'),
+            'mean': getattr(self, f'{attribute}_sum') / self.applicant_count if self.applicant_count else None,
+            'histogram': getattr(self, f'{attribute}_histogram'),
+        }
+
+    def __str__(self):
+        """String representation of the role statistics."""
+
+        return f'{self.role_id}: {self.applicant_count} applicants'
@@ -0,0 +1,114 @@
+"""Full-text search over roles and their projects.
+
+Every role has one document made of its name and its project's name, location and description, weighted in that
+order. Documents live in ``casting_app_role_search``, created by migration 0017 for the database in use:
+
+* SQLite: an FTS5 table whose rowid is the role id, ranked with ``bm25``.
+* PostgreSQL: a ``tsvector`` column behind a GIN index, ranked with ``ts_rank``.
+
+The signals in ``casting_app.signals`` keep documents in sync when roles and projects are saved. Code bypassing
+``save()``, like ``bulk_create``, must call ``index_roles`` or ``rebuild_index`` itself.
+"""
+
+import re
+
+from django.db import connection
+
+TABLE = 'casting_app_role_search'
+# Relative weight of the role name, project name, location and description in the ranking.
+SQLITE_WEIGHTS = (4.0, 3.0, 2.0, 1.0)
+
+SQLITE_DOCUMENT = (
+    'SELECT r.id, r.name, p.name, p.location, p.description '
+    'FROM casting_app_role r JOIN casting_app_project p ON p.id = r.project_id'
+)
+POSTGRESQL_DOCUMENT = (
+    "SELECT r.id, setweight(to_tsvector('english', r.name), 'A') "
+    "|| setweight(to_tsvector('english', p.name), 'B') "
+    "|| setweight(to_tsvector('english', p.location), 'C') "
+    "|| setweight(to_tsvector('english', p.description), 'D') "
+    'FROM casting_app_role r JOIN casting_app_project p ON p.id = r.project_id'
+)
+WORD = re.compile(r'\w+')
+
+
+def index_roles(role_id=None, project_id=None, replace=True):
+    """(Re)build the documents of one role, of every role of a project, or of every role.
+
+    ``replace=False`` skips removing previous documents, for roles that were just created.
+    """
+
+    if role_id is not None:
+        condition, params = 'r.id = %s', [role_id]
+    elif project_id is not None:
+        condition, params = 'r.project_id = %s', [project_id]
+    else:
+        condition, params = '1 = 1', []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'INSERT INTO {TABLE} (role_id, document) {POSTGRESQL_DOCUMENT} WHERE {condition} '  # nosec B608
+                'ON CONFLICT (role_id) DO UPDATE SET document = EXCLUDED.document',
+                params,
+            )
+            return
+        if replace:
+            cursor.execute(
+                f'DELETE FROM {TABLE} WHERE rowid IN (SELECT r.id FROM casting_app_role r WHERE {condition})',  # nosec
+                params,
+            )
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, role_name, project_name, location, description) '  # nosec B608
+            f'{SQLITE_DOCUMENT} WHERE {condition}',
+            params,
+        )
+
+
+def unindex_role(role_id):
+    if connection.vendor == 'postgresql':
+        return  # The foreign key cascades.
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [role_id])  # nosec B608
+
+
+def rebuild_index():
+    """Drop every document and index all roles again."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')  # nosec B608
+    index_roles(replace=False)
+
+
+def search_roles(terms, limit, offset=0):
+    """Ids and ranks of the open roles matching every word of ``terms``, best match first.
+
+    Returns ``(role_id, rank)`` pairs, a higher rank meaning a better match.
+    """
+
+    words = WORD.findall(terms)
+    if not words:
+        return []
+
+    if connection.vendor == 'postgresql':
+        sql = (
+            f'SELECT s.role_id, ts_rank(s.document, query) AS score '  # nosec B608
+            f"FROM {TABLE} s, plainto_tsquery('english', %s) query, casting_app_role r "
+            'WHERE s.document @@ query AND r.id = s.role_id AND r.is_open '
+            'ORDER BY score DESC, s.role_id LIMIT %s OFFSET %s'
+        )
+        params = [' '.join(words), limit, offset]
+    else:
+        # Quoting each word keeps FTS5 query syntax out of user input; bm25 is lower for better matches.
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        sql = (
+            f'SELECT {TABLE}.rowid, -bm25({TABLE}, {weights}) AS score '  # nosec B608
+            f'FROM {TABLE} JOIN casting_app_role r ON r.id = {TABLE}.rowid '
+            f'WHERE {TABLE} MATCH %s AND r.is_open '
+            f'ORDER BY score DESC, {TABLE}.rowid LIMIT %s OFFSET %s'
+        )
+        params = [' '.join(f'"{word}"' for word in words), limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
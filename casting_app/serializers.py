@@ -1,13 +1,110 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
-from .models import Application, Company, Project, Role, Talent
+from . import cache, capacity
+from .matching import application_snapshot, unsatisfied_criteria
+from .models import (
+    Application,
+    ApplicationTicket,
+    Company,
+    Project,
+    Role,
+    RoleStats,
+    RoleTrait,
+    Talent,
+)
+from .stats import record_applications
+from .talent_search import ORDERING_FIELDS
+
+ROLE_FULL = 'Application declined. This role is not accepting more applications'
+
+
+def _pair(application):
+    return application.talent_id, application.role_id
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key relation resolved through the talent and role cache."""
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            return cache.get_instance(model, model._meta.pk.to_python(data))
+        except ObjectDoesNotExist:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
 
 
 class TalentSerializer(serializers.ModelSerializer):
+    """Emails are unique through the ``unique_talent_email`` constraint, which imports upsert against."""
+
+    DUPLICATE_EMAIL = 'A talent with this email exists before'
+
     class Meta:
         model = Talent
         fields = ['name', 'email', 'phone_number', 'age', 'gender', 'ethnicity', 'weight', 'height']
 
+    def create(self, validated_data):
+        """Making sure no two talents share an email."""
+
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({'email': [self.DUPLICATE_EMAIL]})
+
+    def update(self, instance, validated_data):
+        """Making sure no two talents share an email."""
+
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({'email': [self.DUPLICATE_EMAIL]})
+
+
+class TalentSearchSerializer(serializers.Serializer):
+    gender = serializers.CharField(required=False)
+    ethnicity = serializers.CharField(required=False)
+    age_min = serializers.IntegerField(required=False)
+    age_max = serializers.IntegerField(required=False)
+    height_min = serializers.FloatField(required=False)
+    height_max = serializers.FloatField(required=False)
+    weight_min = serializers.FloatField(required=False)
+    weight_max = serializers.FloatField(required=False)
+    ordering = serializers.ChoiceField(
+        choices=[prefix + field for field in ORDERING_FIELDS for prefix in ('', '-')], default='id'
+    )
+
+    def validate(self, data):
+        """Making sure every search can be answered from an index."""
+
+        ranges = [key for key in data if key.endswith(('_min', '_max'))]
+        if 'gender' not in data and not ranges:
+            raise serializers.ValidationError('Filter by gender or by an age, height or weight range')
+        return data
+
+
+class RoleSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, default=settings.REST_FRAMEWORK['PAGE_SIZE'])
+
+
+class RoleNearbySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=0, max_value=500, default=25, help_text='Kilometres.')
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=settings.REST_FRAMEWORK['PAGE_SIZE'])
+
 
 class CompanySerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,37 +116,113 @@ class ProjectSerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = '__all__'
+        read_only_fields = ['geohash']
 
     def create(self, validated_data):
         """Making sure no duplicate projects are created."""
 
-        if self.Meta.model.objects.filter(name__icontains=validated_data['name'].lower()).exists():
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
             raise serializers.ValidationError('A project with this name exists before')
-        return super().create(validated_data)
 
 
 class RoleSerializer(serializers.ModelSerializer):
+    """Roles accept their target gender and ethnicity plus any listed in ``genders`` and ``ethnicities``.
+
+    Age, weight and height ranges left out default to the targets plus or minus ``tolerance``.
+    """
+
+    genders = serializers.ListField(
+        child=serializers.CharField(max_length=50), required=False, allow_empty=False, write_only=True
+    )
+    ethnicities = serializers.ListField(
+        child=serializers.CharField(max_length=50), required=False, allow_empty=False, write_only=True
+    )
+    tolerance = serializers.FloatField(required=False, min_value=0, write_only=True)
+
     class Meta:
         model = Role
         fields = '__all__'
+        read_only_fields = ['application_count']
+
+    def validate(self, data):
+        """Fill in the ranges and make sure each of them contains its target."""
+
+        tolerance = data.pop('tolerance', Role.DEFAULT_TOLERANCE)
+        errors = {}
+        for attribute in Role.MEASUREMENTS:
+            target = data[f'talent_{attribute}']
+            low = data.setdefault(f'{attribute}_min', target - tolerance)
+            high = data.setdefault(f'{attribute}_max', target + tolerance)
+            if not low <= target <= high:
+                errors[f'talent_{attribute}'] = [f'Must lie between {attribute}_min and {attribute}_max']
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return super().validate(data)
 
     def create(self, validated_data):
         """Making sure no duplicate roles are created within a project."""
 
-        if self.Meta.model.objects.filter(
-            name=validated_data['name'],
-            project=validated_data['project'],
-            talent_age=validated_data['talent_age'],
-            talent_gender=validated_data['talent_gender'],
-            talent_ethnicity=validated_data['talent_ethnicity'],
-            talent_weight=validated_data['talent_weight'],
-            talent_height=validated_data['talent_height'],
-        ).exists():
+        traits = [(RoleTrait.GENDER, value) for value in validated_data.pop('genders', [])]
+        traits += [(RoleTrait.ETHNICITY, value) for value in validated_data.pop('ethnicities', [])]
+        try:
+            with transaction.atomic():
+                role = super().create(validated_data)
+                RoleTrait.objects.bulk_create(
+                    [RoleTrait(role=role, trait=trait, value=value) for trait, value in traits], ignore_conflicts=True
+                )
+        except IntegrityError:
             raise serializers.ValidationError('This role already exists in this project')
-        return super().create(validated_data)
+        cache.invalidate(Role, role.pk)
+        return role
+
+
+class RoleDetailSerializer(RoleSerializer):
+    """A role with its accepted genders and ethnicities, to be read with ``traits`` prefetched."""
+
+    genders = serializers.SerializerMethodField()
+    ethnicities = serializers.SerializerMethodField()
+    project_name = serializers.CharField(source='project.name', read_only=True)
+    company_name = serializers.CharField(source='project.company.name', read_only=True)
+
+    def get_genders(self, role):
+        return sorted(role.accepted(RoleTrait.GENDER))
+
+    def get_ethnicities(self, role):
+        return sorted(role.accepted(RoleTrait.ETHNICITY))
+
+
+class ProjectDetailSerializer(ProjectSerializer):
+    """A project with its roles, to be read with ``role_set`` and ``role_set__traits`` prefetched."""
+
+    roles = RoleDetailSerializer(source='role_set', many=True, read_only=True)
+    company_name = serializers.CharField(source='company.name', read_only=True)
+
+
+class ProjectSummarySerializer(serializers.ModelSerializer):
+    roles = serializers.ListField(source='get_roles', child=serializers.CharField(), read_only=True)
+
+    class Meta:
+        model = Project
+        fields = ['id', 'name', 'location', 'roles']
+
+
+class CompanyDetailSerializer(CompanySerializer):
+    """A company with its projects and their role names, to be read with ``project_set__role_set`` prefetched."""
+
+    projects = ProjectSummarySerializer(source='project_set', many=True, read_only=True)
+
+    class Meta(CompanySerializer.Meta):
+        fields = ['id'] + CompanySerializer.Meta.fields + ['projects']
 
 
 class ApplicationSerializer(serializers.ModelSerializer):
+    talent = CachedPrimaryKeyRelatedField(queryset=Talent.objects.all())
+    role = CachedPrimaryKeyRelatedField(queryset=Role.objects.all())
+
     class Meta:
         model = Application
         fields = ['talent', 'role']
@@ -57,21 +230,191 @@ class ApplicationSerializer(serializers.ModelSerializer):
     def validate(self, data):
         """Stating some validations for application auto-rejection."""
 
-        talent = data['talent']
-        role = data['role']
-        errors = []
-        if talent.gender != role.talent_gender:
-            errors.append('gender')
-        if talent.ethnicity != role.talent_ethnicity:
-            errors.append('ethnicity')
-        if not role.talent_age - 5 <= talent.age <= role.talent_age + 5:
-            errors.append('age')
-        if not role.talent_weight - 5 <= talent.weight <= role.talent_weight + 5:
-            errors.append('weight')
-        if not role.talent_height - 5 <= talent.height <= role.talent_height + 5:
-            errors.append('height')
+        errors = unsatisfied_criteria(data['talent'], data['role'])
+        if errors:
+            raise serializers.ValidationError(f'Application declined. Unsatisfied criteria of the role: {errors}')
+        # The cached count can only lag behind, a role it shows as full is full.
+        if data['role'].is_full:
+            raise serializers.ValidationError(ROLE_FULL)
+
+        return super().validate(data)
+
+    def create(self, validated_data):
+        """Making sure a talent applies only once for a role."""
+
+        try:
+            with transaction.atomic():
+                if not capacity.reserve(validated_data['role'].pk):
+                    raise serializers.ValidationError(ROLE_FULL)
+                snapshot = application_snapshot(validated_data['talent'], validated_data['role'])
+                application = super().create({**validated_data, **snapshot})
+                record_applications([application])
+        except IntegrityError:
+            raise serializers.ValidationError('This talent already applied for this role')
+        return application
+
+
+class TalentApplicationSerializer(serializers.ModelSerializer):
+    """An application of a talent, to be read with ``select_related('role__project__company')``."""
+
+    role_name = serializers.CharField(source='role.name', read_only=True)
+    project = serializers.IntegerField(source='role.project_id', read_only=True)
+    project_name = serializers.CharField(source='role.project.name', read_only=True)
+    company = serializers.IntegerField(source='role.project.company_id', read_only=True)
+    company_name = serializers.CharField(source='role.project.company.name', read_only=True)
+
+    class Meta:
+        model = Application
+        fields = [
+            'id',
+            'role',
+            'role_name',
+            'project',
+            'project_name',
+            'company',
+            'company_name',
+            'datetime_applied',
+            'match_score',
+        ]
+
+
+class ApplicationBulkItemSerializer(serializers.Serializer):
+    talent = serializers.IntegerField()
+    role = serializers.IntegerField()
+
+
+class ApplicationBulkSerializer(serializers.Serializer):
+    applications = serializers.ListField(child=ApplicationBulkItemSerializer(), allow_empty=False, max_length=1000)
 
+    def create(self, validated_data):
+        """Validate the whole batch against two in_bulk lookups and insert the accepted rows at once."""
+
+        rows = validated_data['applications']
+        talents = Talent.objects.in_bulk({row['talent'] for row in rows})
+        roles = Role.objects.prefetch_related('traits').in_bulk({row['role'] for row in rows})
+        applied = set(
+            Application.objects.filter(talent_id__in=talents.keys(), role_id__in=roles.keys()).values_list(
+                'talent_id', 'role_id'
+            )
+        )
+
+        results = []
+        accepted = []
+        for row in rows:
+            result = {'talent': row['talent'], 'role': row['role']}
+            talent = talents.get(row['talent'])
+            role = roles.get(row['role'])
+            missing = {
+                field: [f'Invalid pk "{row[field]}" - object does not exist.']
+                for field, instance in (('talent', talent), ('role', role))
+                if instance is None
+            }
+            if missing:
+                result.update(status='invalid', errors=missing)
+            elif (row['talent'], row['role']) in applied:
+                result.update(
+                    status='invalid', errors={'non_field_errors': ['This talent already applied for this role']}
+                )
+            else:
+                errors = unsatisfied_criteria(talent, role)
+                if role.is_full:
+                    errors.append('max_applications')
+                if errors:
+                    result.update(status='declined', errors=errors)
+                else:
+                    result['status'] = 'accepted'
+                    applied.add((row['talent'], row['role']))
+                    accepted.append(
+                        (result, Application(talent=talent, role=role, **application_snapshot(talent, role)))
+                    )
+            results.append(result)
+
+        # Capped roles stay locked until the applications are inserted and counted.
+        with transaction.atomic():
+            places = capacity.lock_places({application.role_id for _, application in accepted})
+            left = dict(places)
+            inserting = []
+            for result, application in accepted:
+                if application.role_id in left:
+                    if not left[application.role_id]:
+                        result.update(status='declined', errors=['max_applications'])
+                        continue
+                    left[application.role_id] -= 1
+                inserting.append((result, application))
+            inserted = self.insert(
+                [application for _, application in inserting],
+                {_pair(application): result for result, application in inserting},
+            )
+            capacity.add_applications(Counter(application.role_id for application in inserted), places)
+            record_applications(inserted)
+        return results
+
+    def insert(self, applications, results):
+        """Insert the applications, reporting as duplicates those a concurrent request inserted since the check.
+
+        ``results`` maps each ``(talent_id, role_id)`` pair to its result. Returns the applications inserted.
+        """
+
+        while applications:
+            try:
+                with transaction.atomic():
+                    return Application.objects.bulk_create(applications)
+            except IntegrityError:
+                taken = set(
+                    Application.objects.filter(
+                        talent_id__in={application.talent_id for application in applications},
+                        role_id__in={application.role_id for application in applications},
+                    ).values_list('talent_id', 'role_id')
+                )
+                racing = [application for application in applications if _pair(application) in taken]
+                if not racing:
+                    raise
+                for application in racing:
+                    results[_pair(application)].update(
+                        status='invalid', errors={'non_field_errors': ['This talent already applied for this role']}
+                    )
+                applications = [application for application in applications if _pair(application) not in taken]
+        return []
+
+
+class ApplicationTicketSerializer(serializers.ModelSerializer):
+    """A queued application: the criteria are checked up front, duplicates only once a worker inserts it."""
+
+    talent = CachedPrimaryKeyRelatedField(queryset=Talent.objects.all())
+    role = CachedPrimaryKeyRelatedField(queryset=Role.objects.all())
+
+    class Meta:
+        model = ApplicationTicket
+        fields = ['id', 'talent', 'role', 'status', 'errors', 'created_at', 'processed_at']
+        read_only_fields = ['status', 'errors', 'created_at', 'processed_at']
+
+    def validate(self, data):
+        """Decline right away applications that cannot satisfy the role criteria."""
+
+        errors = unsatisfied_criteria(data['talent'], data['role'])
         if errors:
             raise serializers.ValidationError(f'Application declined. Unsatisfied criteria of the role: {errors}')
+        # Workers reserve places when inserting, only roles already full are turned down here.
+        if data['role'].is_full:
+            raise serializers.ValidationError(ROLE_FULL)
 
         return super().validate(data)
+
+
+class RoleStatsSerializer(serializers.ModelSerializer):
+    age = serializers.SerializerMethodField()
+    height = serializers.SerializerMethodField()
+    weight = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RoleStats
+        fields = ['role', 'applicant_count', 'age', 'height', 'weight', 'daily_applications']
+
+    def get_age(self, stats):
+        return stats.distribution('age')
+
+    def get_height(self, stats):
+        return stats.distribution('height')
+
+    def get_weight(self, stats):
+        return stats.distribution('weight')
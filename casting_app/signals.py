@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache, capacity, search, stats
+from .models import Application, Project, Role, RoleTrait, Talent
+
+
+@receiver(post_save, sender=Talent)
+@receiver(post_delete, sender=Talent)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_cached_instance(sender, instance, **kwargs):
+    """Drop the cached copy of a talent or role whenever it changes.
+
+    Dropped again once the transaction commits: a concurrent request may have cached the previous committed
+    version in between, and ``Role.save`` keeps writing traits after this signal.
+    """
+
+    cache.invalidate(sender, instance.pk)
+    pk = instance.pk
+    transaction.on_commit(lambda: cache.invalidate(sender, pk))
+
+
+@receiver(post_save, sender=RoleTrait)
+@receiver(post_delete, sender=RoleTrait)
+def invalidate_cached_role(sender, instance, **kwargs):
+    """Cached roles embed their traits."""
+
+    cache.invalidate(Role, instance.role_id)
+
+
+@receiver(post_save, sender=Role)
+def index_role(sender, instance, created, **kwargs):
+    """Keep the search document of a role in sync with it."""
+
+    search.index_roles(role_id=instance.pk, replace=not created)
+
+
+@receiver(post_save, sender=Project)
+def index_project_roles(sender, instance, created, **kwargs):
+    """Project fields are part of the search documents of its roles, a new project has none yet."""
+
+    if not created:
+        search.index_roles(project_id=instance.pk)
+
+
+@receiver(post_delete, sender=Role)
+def unindex_role(sender, instance, **kwargs):
+    search.unindex_role(instance.pk)
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application(sender, instance, **kwargs):
+    """A withdrawn application frees its place on the role and leaves the role's statistics."""
+
+    capacity.release(instance.role_id)
+    stats.forget_application(instance)
+    # Cached roles carry the counter and is_open, see invalidate_cached_instance for the second drop.
+    role_id = instance.role_id
+    cache.invalidate(Role, role_id)
+    transaction.on_commit(lambda: cache.invalidate(Role, role_id))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply the SQLite tuning PRAGMAs from settings to every new connection."""
+
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            for pragma, value in settings.SQLITE_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """Close reused connections that went away while idle, like Django 4.1's CONN_HEALTH_CHECKS."""
+
+    for connection in connections.all():
+        if connection.connection is not None and connection.settings_dict.get('CONN_HEALTH_CHECKS'):
+            if not connection.is_usable():
+                connection.close()
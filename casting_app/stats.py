@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Min
+
+from .models import Application, RoleStats
+
+
+def _locked_stats(role_id):
+    """Return the statistics of a role, locked until the end of the transaction, creating them if needed.
+
+    Two first applications to a role can both miss the row and insert it. The loser's insert conflicts once the
+    winner commits, and it then locks the row the winner created, so a statistics conflict is never taken for a
+    duplicate application.
+    """
+
+    stats = RoleStats.objects.select_for_update().filter(role_id=role_id).first()
+    if stats is not None:
+        return stats
+    try:
+        with transaction.atomic():
+            return RoleStats.objects.create(role_id=role_id)
+    except IntegrityError:
+        return RoleStats.objects.select_for_update().get(role_id=role_id)
+
+
+def record_applications(applications):
+    """Fold newly inserted applications into the statistics of their roles."""
+
+    by_role = defaultdict(list)
+    for application in applications:
+        by_role[application.role_id].append(application)
+
+    with transaction.atomic(savepoint=False):
+        for role_id, role_applications in by_role.items():
+            stats = _locked_stats(role_id)
+            for application in role_applications:
+                stats.add_applicant(application.talent, application.datetime_applied.date())
+            stats.save()
+
+
+def forget_application(application):
+    """Take a deleted application out of the statistics of its role."""
+
+    stats = RoleStats.objects.select_for_update().filter(role_id=application.role_id).first()
+    if stats is None:
+        return
+    if stats.remove_applicant(application.talent, application.datetime_applied.date()):
+        bounds = Application.objects.filter(role_id=application.role_id).aggregate(
+            **{
+                f'{attribute}_{bound.__name__.lower()}': bound(f'talent__{attribute}')
+                for attribute in RoleStats.DISTRIBUTION_ATTRIBUTES
+                for bound in (Min, Max)
+            }
+        )
+        for field, value in bounds.items():
+            setattr(stats, field, value)
+    stats.save()
+
+
+def rebuild_role_stats(role_ids=None, batch_size=500):
+    """Recompute role statistics from scratch, for every role or only ``role_ids``.
+
+    Applications are streamed in role order so only one role's statistics are being built at a time.
+    Returns the number of roles with applicants.
+    """
+
+    applications = Application.objects.select_related('talent').order_by('role_id')
+    existing = RoleStats.objects.all()
+    if role_ids is not None:
+        applications = applications.filter(role_id__in=role_ids)
+        existing = existing.filter(role_id__in=role_ids)
+
+    rebuilt = 0
+    batch = []
+    with transaction.atomic():
+        existing.delete()
+        for application in applications.iterator(chunk_size=2000):
+            if not batch or batch[-1].role_id != application.role_id:
+                if len(batch) > batch_size:
+                    RoleStats.objects.bulk_create(batch)
+                    batch = []
+                batch.append(RoleStats(role_id=application.role_id))
+                rebuilt += 1
+            batch[-1].add_applicant(application.talent, application.datetime_applied.date())
+        RoleStats.objects.bulk_create(batch)
+    return rebuilt
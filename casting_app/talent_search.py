@@ -0,0 +1,34 @@
+"""Talent search filters and the indexes behind them.
+
+Every search must filter on ``gender`` or on a range of ``age``, ``height`` or ``weight``. Each supported
+combination is served by one of these indexes (see ``tests/test_query_plans.py``):
+
+* ``gender`` [+ ``ethnicity``] [+ age range]: ``talent_match_idx (gender, ethnicity, age)``
+* ``gender`` + height range: ``talent_gender_height_idx (gender, height)``
+* ``gender`` + weight range: ``talent_gender_weight_idx (gender, weight)``
+* age, height or weight range alone: ``talent_age_idx``, ``talent_height_idx``, ``talent_weight_idx``
+"""
+
+RANGE_FIELDS = ('age', 'height', 'weight')
+ORDERING_FIELDS = ('id', 'age', 'height', 'weight')
+
+
+def search_lookups(filters):
+    """Translate validated search parameters into ORM lookups."""
+
+    lookups = {field: filters[field] for field in ('gender', 'ethnicity') if field in filters}
+    for field in RANGE_FIELDS:
+        if f'{field}_min' in filters:
+            lookups[f'{field}__gte'] = filters[f'{field}_min']
+        if f'{field}_max' in filters:
+            lookups[f'{field}__lte'] = filters[f'{field}_max']
+    return lookups
+
+
+def keyset_ordering(ordering):
+    """Ordering columns for keyset pagination, always ending in the unique ``id``."""
+
+    field = ordering.lstrip('-')
+    if field == 'id':
+        return (ordering,)
+    return (ordering, '-id' if ordering.startswith('-') else 'id')
@@ -0,0 +1,6 @@
+from django.conf import settings
+from django.core.cache import caches
+
+# The casting cache outlives test runs on the file backend, where earlier runs may have cached rows under the
+# same primary keys.
+caches[settings.CASTING_CACHE_ALIAS].clear()
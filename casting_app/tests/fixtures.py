@@ -0,0 +1,52 @@
+"""The company, project, role and talent most tests start from.
+
+``create_*`` fill in the usual values and take keyword arguments overriding them. The talent qualifies for the role.
+"""
+
+from ..models import Company, Project, Role, Talent
+
+ROLE_CRITERIA = {
+    'talent_age': 35,
+    'talent_gender': 'male',
+    'talent_ethnicity': 'white',
+    'talent_weight': 85,
+    'talent_height': 172,
+}
+
+
+def create_company(**fields):
+    return Company.objects.create(**{'name': 'seedstars', 'email': 'test@seed.com', 'description': 'test', **fields})
+
+
+def create_project(company, **fields):
+    return Project.objects.create(
+        company=company, **{'name': 'Eagle eye', 'description': 'test description', 'location': 'Cairo', **fields}
+    )
+
+
+def create_role(project, **fields):
+    return Role.objects.create(project=project, **{'name': 'pilot', **ROLE_CRITERIA, **fields})
+
+
+def create_talent(**fields):
+    values = {
+        'name': 'Mohamed Mousa',
+        'age': 33,
+        'email': 'test@yahoo.com',
+        'gender': 'male',
+        'ethnicity': 'white',
+        'weight': 88,
+        'height': 170,
+    }
+    return Talent.objects.create(**{**values, **fields})
+
+
+class CastingFixtures:
+    """Test case mixin setting ``company``, ``project``, ``role`` and ``talent`` up before each test."""
+
+    def setUp(self):
+        super().setUp()
+        self.company = create_company()
+        self.project = create_project(self.company)
+        self.role = create_role(self.project)
+        self.talent = create_talent()
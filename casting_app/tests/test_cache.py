@@ -0,0 +1,78 @@
+import os
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .. import cache
+from ..checks import check_cache_is_shared
+from ..models import Role, Talent
+from .fixtures import CastingFixtures
+
+
+class CacheTest(CastingFixtures, TestCase):
+    """Test the read-through cache of talents and roles."""
+
+    def setUp(self):
+        caches[settings.CASTING_CACHE_ALIAS].clear()
+        super().setUp()
+
+    def test_read_through(self):
+        before = cache.cache_stats()['talent']
+        with self.assertNumQueries(1):
+            self.assertEqual(cache.get_talent(self.talent.pk), self.talent)
+            self.assertEqual(cache.get_talent(self.talent.pk), self.talent)
+        after = cache.cache_stats()['talent']
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_missing_row_is_not_cached(self):
+        with self.assertRaises(Talent.DoesNotExist):
+            cache.get_talent(30)
+        with self.assertNumQueries(1), self.assertRaises(Talent.DoesNotExist):
+            cache.get_talent(30)
+
+    def test_save_invalidates(self):
+        cache.get_role(self.role.pk)
+        self.role.talent_age = 40
+        self.role.save()
+        # The role and its prefetched traits.
+        with self.assertNumQueries(2):
+            self.assertEqual(cache.get_role(self.role.pk).talent_age, 40)
+
+    def test_commit_invalidates_again(self):
+        committed = cache.get_role(self.role.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.talent_gender = 'female'
+            self.role.save()
+            # A concurrent request caches the committed version before this transaction ends.
+            caches[settings.CASTING_CACHE_ALIAS].set(cache._key(Role, self.role.pk), committed)
+        self.assertEqual(cache.get_role(self.role.pk).accepted('gender'), {'female'})
+
+    def test_delete_invalidates(self):
+        cache.get_talent(self.talent.pk)
+        pk = self.talent.pk
+        self.talent.delete()
+        with self.assertRaises(Talent.DoesNotExist):
+            cache.get_talent(pk)
+
+
+class CacheCheckTest(SimpleTestCase):
+    """A per-process cache is only allowed with a single worker."""
+
+    locmem = {
+        **settings.CACHES,
+        settings.CASTING_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    }
+
+    def test_shared_cache_passes(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+            self.assertEqual(check_cache_is_shared(None), [])
+
+    def test_local_memory_cache_needs_a_single_worker(self):
+        with override_settings(CACHES=self.locmem):
+            with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '1'}):
+                self.assertEqual(check_cache_is_shared(None), [])
+            with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4'}):
+                self.assertEqual([error.id for error in check_cache_is_shared(None)], ['casting_app.E001'])
@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Application, Company, Project, Role, Talent
+from .fixtures import CastingFixtures
+
+
+class ImportTalentsCommandTest(TestCase):
+    """Test the import_talents management command."""
+
+    def test_import_in_chunks(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as source:
+            for index in range(25):
+                row = {
+                    'name': f'Talent {index}',
+                    'email': f'talent{index}@test.com',
+                    'phone_number': '0100',
+                    'age': 30,
+                    'gender': 'male',
+                    'ethnicity': 'white',
+                    'weight': 80,
+                    'height': 175,
+                }
+                source.write(json.dumps(row) + '\n')
+        self.addCleanup(os.remove, source.name)
+
+        out = StringIO()
+        call_command('import_talents', source.name, '--chunk-size', '10', stdout=out)
+        self.assertEqual(json.loads(out.getvalue()), {'created': 25, 'updated': 0, 'errors': []})
+        self.assertEqual(Talent.objects.count(), 25)
+
+        out = StringIO()
+        call_command('import_talents', source.name, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['updated'], 25)
+        self.assertEqual(Talent.objects.count(), 25)
+
+
+class ExportApplicationsCommandTest(CastingFixtures, TestCase):
+    """Test the export_applications management command."""
+
+    def setUp(self):
+        super().setUp()
+        Application.objects.create(talent=self.talent, role=self.role)
+
+    def test_export_to_stdout(self):
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command('export_applications', '--company', str(self.company.pk), '--format', 'ndjson', stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['email'], 'test@yahoo.com')
+
+    def test_export_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'applications.csv')
+            call_command('export_applications', '--project', str(self.project.pk), '--output', path)
+            with open(path, encoding='utf-8') as exported:
+                self.assertEqual(len(exported.read().splitlines()), 2)
+
+
+class SeedBenchmarkCommandTest(TestCase):
+    def test_seed(self):
+        options = {'companies': 2, 'projects': 2, 'roles': 3, 'talents': 50, 'applications': 5, 'stdout': StringIO()}
+        call_command('seed_benchmark', **options)
+        call_command('seed_benchmark', **options)
+
+        self.assertEqual(Company.objects.count(), 4)
+        self.assertEqual(Project.objects.count(), 8)
+        self.assertEqual(Role.objects.count(), 24)
+        self.assertEqual(Talent.objects.count(), 100)
+        self.assertEqual(Application.objects.count(), 24 * 5)
+        role = Role.objects.first()
+        self.assertEqual(role.stats.applicant_count, role.application_set.count())
@@ -0,0 +1,54 @@
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from ..fast_serializers import ValuesSerializer
+from ..models import Application, Role, Talent
+from ..renderers import FastJSONRenderer
+from ..serializers import RoleSerializer, TalentSerializer
+from .fixtures import create_company, create_project, create_role
+
+ROWS = 2000
+
+
+class ValuesSerializerTest(TestCase):
+    """The .values() fast path must match the ModelSerializer output, see benchmarks/serializers.py for its speed."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.role = create_role(create_project(create_company()), talent_weight=85.5)
+        Talent.objects.bulk_create(
+            Talent(
+                name=f'Talent {index}',
+                email=f'talent{index}@test.com',
+                phone_number='0100',
+                age=20 + index % 30,
+                gender='male',
+                ethnicity='white',
+                weight=60 + index % 40 / 3,
+                height=160 + index % 40,
+            )
+            for index in range(ROWS)
+        )
+        Application.objects.bulk_create(Application(talent=talent, role=cls.role) for talent in Talent.objects.all())
+
+    def test_talent_rows_match(self):
+        queryset = Talent.objects.order_by('id')
+        fast = ValuesSerializer(TalentSerializer)
+        self.assertEqual(fast.to_representation(fast.values(queryset)), TalentSerializer(queryset, many=True).data)
+
+    def test_applicant_rows_match(self):
+        queryset = Application.objects.filter(role=self.role).order_by('id')
+        fast = ValuesSerializer(TalentSerializer, source='talent')
+        expected = TalentSerializer(
+            [application.talent for application in queryset.select_related('talent')], many=True
+        )
+        self.assertEqual(fast.to_representation(fast.values(queryset, 'id')), expected.data)
+
+    def test_role_rows_match(self):
+        queryset = Role.objects.order_by('id')
+        fast = ValuesSerializer(RoleSerializer)
+        self.assertEqual(fast.to_representation(fast.values(queryset, 'id')), RoleSerializer(queryset, many=True).data)
+
+    def test_renderer_output_matches(self):
+        data = {'next': None, 'results': TalentSerializer(Talent.objects.order_by('id')[:50], many=True).data}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
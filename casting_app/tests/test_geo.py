@@ -0,0 +1,60 @@
+import math
+
+from django.test import SimpleTestCase
+
+from .. import geo
+
+
+class GeoTest(SimpleTestCase):
+    """Test geocoding and geohash bucketing."""
+
+    def test_encode(self):
+        self.assertEqual(geo.encode(57.64911, 10.40744), 'u4pruydqq')
+        self.assertEqual(geo.encode(-25.382708, -49.265506, precision=5), '6gkzw')
+
+    def test_geocode(self):
+        self.assertEqual(geo.geocode('Cairo'), (30.0444, 31.2357))
+        self.assertEqual(geo.geocode('  port   said '), (31.2653, 32.3019))
+        self.assertEqual(geo.geocode('Giza, Egypt'), geo.geocode('Giza'))
+        self.assertIsNone(geo.geocode('Atlantis'))
+        self.assertIsNone(geo.geocode(''))
+
+    def test_covering_cells_contain_every_point_within_the_radius(self):
+        latitude, longitude = 30.0444, 31.2357
+        for radius in (1, 10, 25, 50, 300):
+            cells = geo.covering_cells(latitude, longitude, radius)
+            self.assertLessEqual(len(cells), geo.MAX_CELLS)
+            for bearing in range(0, 360, 15):
+                # Points just inside the radius in every direction.
+                point = self.destination(latitude, longitude, bearing, radius * 0.99)
+                with self.subTest(radius=radius, bearing=bearing):
+                    self.assertTrue(any(geo.encode(*point).startswith(cell) for cell in cells))
+
+    def test_covering_cells_are_close_to_the_radius(self):
+        # 25 km around Cairo: precision 4 cells of about 20 by 34 km.
+        cells = geo.covering_cells(30.0444, 31.2357, 25)
+        self.assertEqual({len(cell) for cell in cells}, {4})
+        self.assertLessEqual(len(cells), 12)
+
+    def test_covering_cells_near_the_pole_and_the_antimeridian(self):
+        for latitude, longitude in ((89.9, 0), (-89.9, 120), (10, 179.99), (10, -179.99)):
+            cells = geo.covering_cells(latitude, longitude, 50)
+            self.assertLessEqual(len(cells), geo.MAX_CELLS)
+            for bearing in range(0, 360, 30):
+                point = self.destination(latitude, longitude, bearing, 49)
+                point = (point[0], (point[1] + 180) % 360 - 180)
+                with self.subTest(latitude=latitude, longitude=longitude, bearing=bearing):
+                    self.assertTrue(any(geo.encode(*point).startswith(cell) for cell in cells))
+
+    def test_distance(self):
+        self.assertAlmostEqual(geo.distance_km(30.0444, 31.2357, 31.2001, 29.9187), 179.5, delta=1)
+
+    @staticmethod
+    def destination(latitude, longitude, bearing, distance_km):
+        angle = distance_km / geo.EARTH_RADIUS_KM
+        lat1, lon1, theta = math.radians(latitude), math.radians(longitude), math.radians(bearing)
+        lat2 = math.asin(math.sin(lat1) * math.cos(angle) + math.cos(lat1) * math.sin(angle) * math.cos(theta))
+        lon2 = lon1 + math.atan2(
+            math.sin(theta) * math.sin(angle) * math.cos(lat1), math.cos(angle) - math.sin(lat1) * math.sin(lat2)
+        )
+        return math.degrees(lat2), math.degrees(lon2)
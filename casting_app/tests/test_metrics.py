@@ -0,0 +1,48 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Talent
+
+client = Client()
+
+
+class MetricsTest(TestCase):
+    """Test the request metrics middleware and the /metrics endpoint."""
+
+    def setUp(self):
+        self.talent = Talent.objects.create(
+            name='Mohamed Mousa', age=33, email='test@yahoo.com', gender='male', weight=88, height=170
+        )
+
+    def scrape(self):
+        response = client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode().splitlines()
+
+    def sample(self, lines, prefix):
+        return next(float(line.rsplit(' ', 1)[1]) for line in lines if line.startswith(prefix))
+
+    def test_requests_are_measured_per_view(self):
+        before = self.scrape()
+        count = 'casting_request_duration_seconds_count{view="talent_search"}'
+        previous = self.sample(before, count) if any(line.startswith(count) for line in before) else 0
+
+        client.get(reverse('talent_search'), {'gender': 'male'})
+        lines = self.scrape()
+        self.assertEqual(self.sample(lines, count), previous + 1)
+        self.assertIn('# TYPE casting_request_queries histogram', lines)
+        self.assertTrue(
+            any(line.startswith('casting_request_queries_bucket{view="talent_search",le="1"}') for line in lines)
+        )
+        self.assertTrue(
+            any(line.startswith('casting_render_duration_seconds_sum{view="talent_search"}') for line in lines)
+        )
+        self.assertTrue(any(line.startswith('casting_cache_hits_total{model="talent"}') for line in lines))
+
+    @override_settings(SLOW_REQUEST_SECONDS=0)
+    def test_slow_requests_are_logged_with_their_queries(self):
+        with self.assertLogs('casting_app.slow_requests', level='WARNING') as logs:
+            client.get(reverse('talent_search'), {'gender': 'male'})
+        self.assertIn('talent_search', logs.output[0])
+        self.assertIn('FROM "casting_app_talent"', logs.output[0])
@@ -1,6 +1,6 @@
 from django.test import TestCase
 
-from ..models import Company, Project, Role, Talent
+from ..models import Company, Project, Role, RoleTrait, Talent
 
 
 class TalentTest(TestCase):
@@ -44,3 +44,26 @@ class RoleTest(TestCase):
 
         self.assertEqual(str(self.role), f'{self.role.name} - {self.project.name}')
         self.assertEqual(str(self.project), self.project.name)
+
+    def test_ranges_follow_the_target(self):
+        self.role.talent_age = 40
+        self.role.weight_max = 100
+        self.role.save()
+        self.role.refresh_from_db()
+        self.assertEqual((self.role.age_min, self.role.age_max), (35, 45))
+        self.assertEqual((self.role.weight_min, self.role.weight_max), (83, 100))
+
+        role = Role.objects.get(pk=self.role.pk)
+        role.talent_height = 180
+        role.save()
+        self.assertEqual((role.height_min, role.height_max), (175, 185))
+
+    def test_replaced_target_trait_is_no_longer_accepted(self):
+        RoleTrait.objects.create(role=self.role, trait=RoleTrait.ETHNICITY, value='asian')
+        role = Role.objects.get(pk=self.role.pk)
+        role.talent_gender = 'female'
+        role.talent_ethnicity = 'black'
+        role.save()
+        role = Role.objects.prefetch_related('traits').get(pk=self.role.pk)
+        self.assertEqual(role.accepted(RoleTrait.GENDER), {'female'})
+        self.assertEqual(role.accepted(RoleTrait.ETHNICITY), {'asian', 'black'})
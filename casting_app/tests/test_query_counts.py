@@ -0,0 +1,145 @@
+"""Pin the number of SQL queries each endpoint issues, whatever the amount of data.
+
+Every endpoint is measured against roles with 10, 1,000 and 100,000 applicants (``QUERY_COUNT_SIZES`` overrides
+the sizes). The expected counts are the same for every size: a query count growing with the data is an N+1.
+Counts include the savepoints Django's TestCase wraps around atomic blocks.
+"""
+
+import json
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Application, Talent
+from .fixtures import create_company, create_project, create_role
+
+SIZES = [int(size) for size in os.environ.get('QUERY_COUNT_SIZES', '10,1000,100000').split(',')]
+
+client = Client()
+
+
+class QueryCountMixin:
+    """Endpoint query counts against a role with ``applicants`` applicants."""
+
+    applicants = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.company = create_company()
+        cls.project = create_project(cls.company)
+        cls.role = create_role(cls.project)
+        Talent.objects.bulk_create(
+            (
+                Talent(
+                    name=f'Talent {index}',
+                    email=f'talent{index}@test.com',
+                    phone_number='0100',
+                    age=35,
+                    gender='male',
+                    ethnicity='white',
+                    weight=85,
+                    height=172,
+                )
+                for index in range(cls.applicants + 1)
+            ),
+            batch_size=5000,
+        )
+        talents = Talent.objects.order_by('id').values_list('id', flat=True)
+        cls.talent = Talent.objects.get(pk=talents[0])
+        Application.objects.bulk_create(
+            (Application(talent_id=talent_id, role=cls.role) for talent_id in talents[1:].iterator()),
+            batch_size=5000,
+        )
+
+    def setUp(self):
+        caches[settings.CASTING_CACHE_ALIAS].clear()
+
+    def post(self, name, payload):
+        return client.post(reverse(name), data=json.dumps(payload), content_type='application/json')
+
+    def test_talent_create(self):
+        payload = {
+            'name': 'Mona Zaki',
+            'email': 'mona@test.com',
+            'phone_number': '0101',
+            'age': 30,
+            'gender': 'female',
+            'ethnicity': 'white',
+            'weight': 60,
+            'height': 165,
+        }
+        # The INSERT within a savepoint, which turns an email conflict into a validation error.
+        with self.assertNumQueries(3):
+            self.assertEqual(self.post('talent_create', payload).status_code, 201)
+
+    def test_talent_get(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get(reverse('talent_get_update', kwargs={'pk': self.talent.pk})).status_code, 200)
+
+    def test_talent_update(self):
+        payload = {
+            'name': 'Mohamed Mousa',
+            'email': 'talent0@test.com',
+            'phone_number': '0100',
+            'age': 36,
+            'gender': 'male',
+            'ethnicity': 'white',
+            'weight': 85,
+            'height': 172,
+        }
+        # The SELECT, then the UPDATE within a savepoint.
+        with self.assertNumQueries(4):
+            response = client.put(
+                reverse('talent_get_update', kwargs={'pk': self.talent.pk}),
+                data=json.dumps(payload),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_company_create(self):
+        with self.assertNumQueries(1):
+            response = self.post('company_create', {'name': 'Acme', 'email': 'acme@test.com', 'description': 'test'})
+        self.assertEqual(response.status_code, 201)
+
+    def test_project_create(self):
+        payload = {'company': self.company.pk, 'name': 'Falcon', 'location': 'Giza', 'description': 'test'}
+        with self.assertNumQueries(4):
+            self.assertEqual(self.post('project_create', payload).status_code, 201)
+
+    def test_role_create(self):
+        payload = {
+            'name': 'officer',
+            'project': self.project.pk,
+            'talent_age': 25,
+            'talent_weight': 75,
+            'talent_height': 180,
+            'talent_gender': 'male',
+            'talent_ethnicity': 'white',
+        }
+        # The role, its target traits and its search document, whatever the number of accepted genders and ethnicities.
+        with self.assertNumQueries(6):
+            self.assertEqual(self.post('role_create', payload).status_code, 201)
+
+    def test_apply(self):
+        # A cold cache loads the role with its traits, the role counter takes one UPDATE.
+        with self.assertNumQueries(12):
+            response = self.post('application_create', {'talent': self.talent.pk, 'role': self.role.pk})
+        self.assertEqual(response.status_code, 201)
+
+    def test_applicant_list(self):
+        with self.assertNumQueries(2):
+            response = client.get(reverse('application_list', kwargs={'role_id': self.role.pk}))
+        self.assertEqual(len(response.json()['results']), min(self.applicants, settings.REST_FRAMEWORK['PAGE_SIZE']))
+
+    def test_applicant_list_next_page(self):
+        first = client.get(reverse('application_list', kwargs={'role_id': self.role.pk}), {'page_size': 5}).json()
+        with self.assertNumQueries(2):
+            self.assertEqual(client.get(first['next']).status_code, 200)
+
+
+for size in SIZES:
+    name = f'QueryCount{size}ApplicantsTest'
+    globals()[name] = type(name, (QueryCountMixin, TestCase), {'applicants': size, '__module__': __name__})
@@ -0,0 +1,108 @@
+import unittest
+from datetime import datetime, timezone
+
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Application, Talent
+from ..pagination import (
+    ApplicationCursorPagination,
+    KeysetPagination,
+    TalentApplicationPagination,
+)
+from ..talent_search import keyset_ordering, search_lookups
+from ..views import RoleNearby
+
+# Every filter combination the talent search supports, see casting_app/talent_search.py.
+SUPPORTED_SEARCHES = [
+    {'gender': 'male'},
+    {'gender': 'male', 'ethnicity': 'white'},
+    {'gender': 'male', 'ethnicity': 'white', 'age_min': 25, 'age_max': 35},
+    {'gender': 'male', 'age_min': 25, 'age_max': 35},
+    {'gender': 'male', 'height_min': 170, 'height_max': 180},
+    {'gender': 'male', 'weight_min': 70, 'weight_max': 80},
+    {'age_min': 25, 'age_max': 35},
+    {'height_min': 170, 'height_max': 180},
+    {'weight_min': 70, 'weight_max': 80},
+    {'age_min': 25, 'age_max': 35, 'height_min': 170, 'weight_max': 80},
+]
+ORDERINGS = ['id', 'age', '-height', 'weight']
+LAST_ROW = {'id': 500, 'age': 30, 'height': 175.0, 'weight': 75.0}
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Query plans are asserted against SQLite')
+class TalentSearchQueryPlanTest(TestCase):
+    """Every supported talent search is answered from an index, never by scanning the talent table."""
+
+    def search_plan(self, filters, ordering, after_last_row=False):
+        paginator = KeysetPagination()
+        paginator.ordering = keyset_ordering(ordering)
+        paginator.fields = [field.lstrip('-') for field in paginator.ordering]
+        queryset = Talent.objects.filter(**search_lookups(filters)).order_by(*paginator.ordering)
+        if after_last_row:
+            queryset = queryset.filter(paginator.after([LAST_ROW[field] for field in paginator.fields]))
+        return queryset.explain()
+
+    def assertUsesIndex(self, plan):
+        # Next pages ordered by id may walk the primary key from the cursor on, which is an index search too.
+        self.assertRegex(plan, r'SEARCH casting_app_talent USING (COVERING INDEX|INDEX|INTEGER PRIMARY KEY)')
+        self.assertNotRegex(plan, r'SCAN casting_app_talent')
+
+    def test_first_page_uses_an_index(self):
+        for filters in SUPPORTED_SEARCHES:
+            for ordering in ORDERINGS:
+                with self.subTest(filters=filters, ordering=ordering):
+                    self.assertUsesIndex(self.search_plan(filters, ordering))
+
+    def test_next_pages_use_an_index(self):
+        for filters in SUPPORTED_SEARCHES:
+            for ordering in ORDERINGS:
+                with self.subTest(filters=filters, ordering=ordering):
+                    self.assertUsesIndex(self.search_plan(filters, ordering, after_last_row=True))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Query plans are asserted against SQLite')
+class ApplicationScoreQueryPlanTest(TestCase):
+    """Applicants ranked by score are read along application_role_score_idx, without sorting."""
+
+    def test_pages_use_the_score_index(self):
+        paginator = ApplicationCursorPagination()
+        paginator.ordering = paginator.score_ordering
+        paginator.fields = [field.lstrip('-') for field in paginator.ordering]
+        queryset = Application.objects.filter(role_id=1, match_score__isnull=False).order_by(*paginator.ordering)
+        for page in (queryset, queryset.filter(paginator.after([0.5, 100]))):
+            with self.subTest(query=str(page.query)):
+                plan = page[:11].explain()
+                self.assertIn('application_role_score_idx', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Query plans are asserted against SQLite')
+class TalentApplicationQueryPlanTest(TestCase):
+    """A talent's applications are read along application_talent_date_idx, without sorting."""
+
+    def test_pages_use_the_talent_index(self):
+        paginator = TalentApplicationPagination()
+        paginator.fields = [field.lstrip('-') for field in paginator.ordering]
+        queryset = (
+            Application.objects.filter(talent_id=1)
+            .select_related('role__project__company')
+            .order_by(*paginator.ordering)
+        )
+        for page in (queryset, queryset.filter(paginator.after([datetime(2022, 7, 1, tzinfo=timezone.utc), 100]))):
+            with self.subTest(query=str(page.query)):
+                plan = page[:11].explain()
+                self.assertIn('application_talent_date_idx', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Query plans are asserted against SQLite')
+class NearbyQueryPlanTest(TestCase):
+    """Nearby role searches only read projects in the covering geohash cells, then their roles by project."""
+
+    def test_cells_are_index_ranges(self):
+        plan = RoleNearby().get_nearby(30.05, 31.24, 25)[:20].explain()
+        self.assertRegex(plan, r'SEARCH casting_app_project USING (COVERING )?INDEX casting_app_project_geohash')
+        self.assertRegex(plan, r'SEARCH casting_app_role USING INDEX')
+        self.assertNotIn('SCAN casting_app_project', plan)
+        self.assertNotIn('SCAN casting_app_role', plan)
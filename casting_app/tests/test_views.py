@@ -1,11 +1,48 @@
+import csv
+import importlib
 import json
+from io import StringIO
+from unittest import mock
 
-from django.test import Client, TestCase
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection
+from django.test import (
+    AsyncClient,
+    Client,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
+from django.utils.module_loading import import_string
 from rest_framework import status
 
-from ..models import Application, Company, Project, Role, Talent
+from .. import cache, capacity, geo, importers, stats
+from ..application_queue import claim_tickets, process_tickets, release_stale_tickets
+from ..capacity import recount_applications
+from ..matching import application_snapshot
+from ..models import (
+    Application,
+    ApplicationTicket,
+    Company,
+    Project,
+    Role,
+    RoleStats,
+    Talent,
+)
 from ..serializers import TalentSerializer
+from .fixtures import (
+    CastingFixtures,
+    create_company,
+    create_project,
+    create_role,
+    create_talent,
+)
 
 # initialize the APIClient app
 client = Client()
@@ -58,6 +95,15 @@ class CreateNewTalentTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Talent.objects.count(), 0)
 
+    def test_create_talent_with_a_taken_email(self):
+        client.post(reverse('talent_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+        response = client.post(
+            reverse('talent_create'), data=json.dumps(self.valid_payload), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, {'email': ['A talent with this email exists before']})
+        self.assertEqual(Talent.objects.count(), 1)
+
 
 class GetSingleTalentTest(TestCase):
     """Test module for GET single talent API."""
@@ -73,6 +119,25 @@ class GetSingleTalentTest(TestCase):
         self.assertEqual(response.data, serializer.data)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_single_talent_is_cached(self):
+        client.get(reverse('talent_get_update', kwargs={'pk': self.talent_1.pk}))
+        with self.assertNumQueries(0):
+            response = client.get(reverse('talent_get_update', kwargs={'pk': self.talent_1.pk}))
+        self.assertEqual(response.data['name'], 'Mohamed Mousa')
+
+    def test_get_single_talent_conditionally(self):
+        url = reverse('talent_get_update', kwargs={'pk': self.talent_1.pk})
+        response = client.get(url)
+        self.assertIn('Last-Modified', response)
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.talent_1.age = 34
+        self.talent_1.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_get_invalid_single_talent(self):
         response = client.get(reverse('talent_get_update', kwargs={'pk': 30}))
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -173,6 +238,13 @@ class CreateNewProjectTest(TestCase):
         self.assertEqual(Project.objects.first().description, 'test')
         self.assertEqual(Project.objects.first().location, 'Cairo')
 
+    def test_create_duplicate_project(self):
+        client.post(reverse('project_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+        payload = dict(self.valid_payload, name='EAGLE EYE')
+        response = client.post(reverse('project_create'), data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Project.objects.count(), 1)
+
     def test_create_invalid_project(self):
         response = client.post(
             reverse('project_create'), data=json.dumps(self.invalid_payload), content_type='application/json'
@@ -220,6 +292,14 @@ class CreateNewRoleTest(TestCase):
         self.assertEqual(Role.objects.first().talent_gender, 'male')
         self.assertEqual(Role.objects.first().talent_ethnicity, 'white')
 
+    def test_create_duplicate_role(self):
+        client.post(reverse('role_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+        response = client.post(
+            reverse('role_create'), data=json.dumps(self.valid_payload), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Role.objects.count(), 1)
+
     def test_create_invalid_role(self):
         response = client.post(
             reverse('role_create'), data=json.dumps(self.invalid_payload), content_type='application/json'
@@ -228,6 +308,213 @@ class CreateNewRoleTest(TestCase):
         self.assertEqual(Role.objects.count(), 0)
 
 
+class BrowsingTest(TestCase):
+    """Test reading companies, projects and open roles."""
+
+    def setUp(self):
+        self.company = create_company()
+        self.add_projects(self.company, 2)
+
+    def add_projects(self, company, count):
+        offset = company.project_set.count()
+        for index in range(offset, offset + count):
+            project = create_project(company, name=f'{company.name} {index}')
+            for name, gender in (('pilot', 'male'), ('nurse', 'female')):
+                create_role(project, name=name, talent_gender=gender)
+
+    def assertQueryCountIsFixed(self, url, queries):
+        with self.assertNumQueries(queries):
+            small = client.get(url)
+        company = Company.objects.create(name='acme', email='acme@test.com', description='test')
+        self.add_projects(company, 3)
+        self.add_projects(self.company, 2)
+        with self.assertNumQueries(queries):
+            large = client.get(url)
+        self.assertEqual(small.status_code, status.HTTP_200_OK)
+        self.assertEqual(large.status_code, status.HTTP_200_OK)
+        return large
+
+    def test_company_list(self):
+        response = self.assertQueryCountIsFixed(reverse('company_list'), 3)
+        companies = response.data['results']
+        self.assertEqual([company['name'] for company in companies], ['seedstars', 'acme'])
+        self.assertEqual(len(companies[0]['projects']), 4)
+        self.assertEqual(companies[0]['projects'][0]['roles'], ['pilot', 'nurse'])
+
+    def test_company_detail(self):
+        response = self.assertQueryCountIsFixed(reverse('company_get', kwargs={'pk': self.company.pk}), 3)
+        self.assertEqual(len(response.data['projects']), 4)
+        self.assertEqual(client.get(reverse('company_get', kwargs={'pk': 30})).status_code, 404)
+
+    def test_project_list(self):
+        response = self.assertQueryCountIsFixed(reverse('project_list'), 3)
+        project = response.data['results'][0]
+        self.assertEqual(project['company_name'], 'seedstars')
+        self.assertEqual([role['name'] for role in project['roles']], ['pilot', 'nurse'])
+        self.assertEqual(project['roles'][1]['genders'], ['female'])
+
+    def test_project_detail(self):
+        project = Project.objects.first()
+        response = self.assertQueryCountIsFixed(reverse('project_get', kwargs={'pk': project.pk}), 3)
+        self.assertEqual(len(response.data['roles']), 2)
+
+    def test_open_role_list(self):
+        closed = set(Role.objects.filter(name='nurse').values_list('id', flat=True))
+        Role.objects.filter(id__in=closed).update(is_open=False)
+        response = self.assertQueryCountIsFixed(reverse('role_list') + '?page_size=100', 2)
+        roles = response.data['results']
+        self.assertEqual(len(roles), Role.objects.count() - len(closed))
+        self.assertFalse(closed & {role['id'] for role in roles})
+        self.assertEqual(roles[0]['company_name'], 'seedstars')
+        self.assertEqual(roles[0]['ethnicities'], ['white'])
+
+    def test_role_detail(self):
+        role = Role.objects.first()
+        with self.assertNumQueries(2):
+            response = client.get(reverse('role_get', kwargs={'pk': role.pk}))
+        self.assertEqual(response.data['project_name'], 'seedstars 0')
+        self.assertEqual(response.data['genders'], ['male'])
+
+    def test_get_roles_uses_prefetched_roles(self):
+        project = Project.objects.prefetch_related('role_set').get(name='seedstars 0')
+        with self.assertNumQueries(0):
+            self.assertEqual(project.get_roles(), ['pilot', 'nurse'])
+        project = Project.objects.get(name='seedstars 1')
+        with self.assertNumQueries(1):
+            self.assertEqual(project.get_roles(), ['pilot', 'nurse'])
+
+
+class RoleSearchTest(TestCase):
+    """Test the full-text search over roles and projects."""
+
+    def setUp(self):
+        self.company = create_company()
+        self.desert = create_project(
+            self.company, name='Desert storm', description='A war drama shot in the desert', location='Luxor'
+        )
+        self.harbour = create_project(
+            self.company, name='Harbour lights', description='Romance with a harbour pilot', location='Alexandria'
+        )
+        self.pilot = create_role(self.desert, name='fighter pilot')
+        self.medic = create_role(self.desert, name='medic')
+        self.sailor = create_role(self.harbour, name='sailor')
+
+    def search(self, **params):
+        response = client.get(reverse('role_search'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_search_ranks_role_names_first(self):
+        results = self.search(q='pilot')['results']
+        self.assertEqual([role['name'] for role in results], ['fighter pilot', 'sailor'])
+        results = self.search(q='pilot desert')['results']
+        self.assertEqual([role['name'] for role in results], ['fighter pilot'])
+        results = self.search(q='desert')['results']
+        self.assertEqual({role['name'] for role in results}, {'fighter pilot', 'medic'})
+        self.assertEqual(results[0]['project_name'], 'Desert storm')
+        self.assertGreaterEqual(results[0]['rank'], results[1]['rank'])
+
+    def test_search_stems_and_ignores_query_syntax(self):
+        self.assertEqual([role['name'] for role in self.search(q='"sailors" (NEAR')['results']], [])
+        self.assertEqual([role['name'] for role in self.search(q='"sailors')['results']], ['sailor'])
+        self.assertEqual(self.search(q='*')['results'], [])
+
+    def test_search_follows_saves_and_deletes(self):
+        self.harbour.location = 'Port Said'
+        self.harbour.save()
+        self.assertEqual([role['name'] for role in self.search(q='port')['results']], ['sailor'])
+        self.assertEqual(self.search(q='alexandria')['results'], [])
+
+        self.medic.name = 'field nurse'
+        self.medic.save()
+        self.assertEqual([role['name'] for role in self.search(q='nurse')['results']], ['field nurse'])
+        self.medic.delete()
+        self.assertEqual(self.search(q='nurse')['results'], [])
+
+    def test_search_skips_closed_roles(self):
+        self.pilot.is_open = False
+        self.pilot.save()
+        self.assertEqual([role['name'] for role in self.search(q='desert')['results']], ['medic'])
+
+    def test_search_pages(self):
+        first = self.search(q='desert', page_size=1)
+        self.assertEqual(len(first['results']), 1)
+        second = client.get(first['next']).data
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+        self.assertNotEqual(first['results'][0]['id'], second['results'][0]['id'])
+
+    def test_search_requires_terms(self):
+        response = client.get(reverse('role_search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RoleNearbyTest(TestCase):
+    """Test finding open roles around a point."""
+
+    def setUp(self):
+        self.company = create_company()
+        for name, location in (('Pyramids', 'Giza'), ('Downtown', 'Cairo'), ('Corniche', 'Alexandria')):
+            create_role(create_project(self.company, name=name, location=location), name=f'{name} extra')
+        self.nowhere = create_project(self.company, name='Lost', location='Atlantis')
+
+    def nearby(self, **params):
+        response = client.get(reverse('role_nearby'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_projects_are_geocoded(self):
+        project = Project.objects.get(name='Downtown')
+        self.assertEqual((project.latitude, project.longitude), (30.0444, 31.2357))
+        self.assertEqual(project.geohash, geo.encode(30.0444, 31.2357))
+        self.assertIsNone(self.nowhere.latitude)
+        self.assertEqual(self.nowhere.geohash, '')
+
+    def test_nearest_first_within_radius(self):
+        results = self.nearby(lat=30.05, lon=31.24, radius=20)
+        self.assertEqual([role['name'] for role in results], ['Downtown extra', 'Pyramids extra'])
+        self.assertLess(results[0]['distance_km'], results[1]['distance_km'])
+        results = self.nearby(lat=30.05, lon=31.24, radius=250, limit=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual([role['name'] for role in self.nearby(lat=30.05, lon=31.24, radius=250)][-1], 'Corniche extra')
+
+    def test_given_coordinates_win_over_the_gazetteer(self):
+        payload = {'name': 'Oasis', 'description': 'test', 'location': 'Siwa', 'latitude': 29.2, 'longitude': 25.5}
+        response = client.post(reverse('project_create'), data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['geohash'], geo.encode(29.2, 25.5))
+
+    def test_moved_project_is_geocoded_again(self):
+        project = Project.objects.get(name='Downtown')
+        project.location = 'Alexandria'
+        project.save()
+        self.assertEqual((project.latitude, project.longitude), geo.geocode('Alexandria'))
+        self.assertEqual(self.nearby(lat=30.05, lon=31.24, radius=20)[0]['name'], 'Pyramids extra')
+
+        project = Project.objects.get(name='Downtown')
+        project.location, project.latitude, project.longitude = 'Somewhere', 29.2, 25.5
+        project.save()
+        self.assertEqual(project.geohash, geo.encode(29.2, 25.5))
+
+    def test_nearby_across_the_antimeridian(self):
+        project = create_project(self.company, name='Taveuni', location='Fiji', latitude=-16.8, longitude=-179.97)
+        create_role(project, name='Taveuni extra')
+        results = self.nearby(lat=-16.8, lon=179.98, radius=10)
+        self.assertEqual([role['name'] for role in results], ['Taveuni extra'])
+        self.assertLess(results[0]['distance_km'], 6)
+
+    def test_query_count(self):
+        with self.assertNumQueries(2):
+            # The nearest roles of projects in the covering cells with their project and company, then their traits.
+            self.nearby(lat=30.05, lon=31.24, radius=20)
+
+    def test_invalid_parameters(self):
+        response = client.get(reverse('role_nearby'), {'lat': 100, 'lon': 31})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = client.get(reverse('role_nearby'), {'lat': 30})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class ApplicationCreateTest(TestCase):
     """Test creating an application to a certain role."""
 
@@ -272,6 +559,43 @@ class ApplicationCreateTest(TestCase):
         self.assertEqual(Application.objects.first().talent.name, 'Mohamed Mousa')
         self.assertEqual(Application.objects.first().role.name, 'pilot')
 
+    def test_snapshot_outlives_role_changes(self):
+        client.post(reverse('application_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+        self.role.talent_age = 50
+        self.role.save()
+
+        application = Application.objects.get()
+        self.assertEqual(
+            application.role_criteria,
+            {
+                'gender': ['male'],
+                'ethnicity': ['white'],
+                'age': [30, 35, 40],
+                'weight': [80, 85, 90],
+                'height': [167, 172, 177],
+            },
+        )
+        self.assertEqual(application.talent_attributes['age'], 33)
+        self.assertEqual(application.match_score, 0.5333)
+
+    def test_backfill_snapshot(self):
+        Application.objects.create(talent=self.talent, role=self.role)
+        migration = importlib.import_module('casting_app.migrations.0011_backfill_application_snapshot')
+        migration.backfill_snapshots(apps, None)
+
+        application = Application.objects.get()
+        self.assertEqual(application.role_criteria['age'], 35)
+        self.assertEqual(application.talent_attributes['height'], 170)
+        self.assertEqual(application.match_score, 0.5333)
+
+    def test_create_duplicate_application(self):
+        client.post(reverse('application_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+        response = client.post(
+            reverse('application_create'), data=json.dumps(self.valid_payload), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Application.objects.count(), 1)
+
     def test_create_invalid_role(self):
         response = client.post(
             reverse('application_create'), data=json.dumps(self.invalid_payload), content_type='application/json'
@@ -279,6 +603,88 @@ class ApplicationCreateTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Application.objects.count(), 0)
 
+    def test_create_counts_applications(self):
+        client.post(reverse('application_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+        self.role.name = 'captain'
+        self.role.save()
+        self.role.refresh_from_db()
+        self.assertEqual(self.role.application_count, 1)
+        self.assertTrue(self.role.is_open)
+
+    def test_create_closes_full_role(self):
+        self.role.max_applications = 1
+        self.role.save()
+        other = Talent.objects.create(
+            name='Kamal Ezz', age=35, email='test2@yahoo.com', gender='male', weight=85, height=172, ethnicity='white'
+        )
+        client.post(reverse('application_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+
+        # The cached role still shows a place left, the counter UPDATE turns the application down.
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                reverse('application_create'),
+                data=json.dumps({'talent': other.pk, 'role': self.role.pk}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse([query for query in queries if 'casting_app_application' in query['sql']])
+        self.assertEqual(Application.objects.count(), 1)
+        self.role.refresh_from_db()
+        self.assertEqual(self.role.application_count, 1)
+        self.assertFalse(self.role.is_open)
+
+        # Once cached as full, the role is turned down without a query.
+        cache.invalidate(Role, self.role.pk)
+        client.post(
+            reverse('application_create'),
+            data=json.dumps({'talent': other.pk, 'role': self.role.pk}),
+            content_type='application/json',
+        )
+        with self.assertNumQueries(0):
+            response = client.post(
+                reverse('application_create'),
+                data=json.dumps({'talent': other.pk, 'role': self.role.pk}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_saving_a_stale_copy_keeps_full_role_closed(self):
+        self.role.max_applications = 1
+        self.role.save()
+        stale = Role.objects.get(pk=self.role.pk)
+        client.post(reverse('application_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+
+        stale.name = 'captain'
+        stale.save()
+        self.assertFalse(stale.is_open)
+        self.role.refresh_from_db()
+        self.assertEqual((self.role.name, self.role.application_count, self.role.is_open), ('captain', 1, False))
+
+    def test_withdrawal_reopens_full_role(self):
+        self.role.max_applications = 1
+        self.role.save()
+        other = Talent.objects.create(
+            name='Kamal Ezz', age=35, email='test2@yahoo.com', gender='male', weight=85, height=172, ethnicity='white'
+        )
+        client.post(reverse('application_create'), data=json.dumps(self.valid_payload), content_type='application/json')
+        client.get(reverse('role_get', kwargs={'pk': self.role.pk}))
+
+        Application.objects.get().delete()
+        self.role.refresh_from_db()
+        self.assertEqual((self.role.application_count, self.role.is_open), (0, True))
+        response = client.post(
+            reverse('application_create'),
+            data=json.dumps({'talent': other.pk, 'role': self.role.pk}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_recount_applications(self):
+        Application.objects.create(talent=self.talent, role=self.role)
+        recount_applications([self.role.pk])
+        self.role.refresh_from_db()
+        self.assertEqual(self.role.application_count, 1)
+
 
 class ApplicationListTest(TestCase):
     """Test listing applications for a certain role."""
@@ -315,4 +721,768 @@ class ApplicationListTest(TestCase):
             reverse('application_list', kwargs={'role_id': self.role.pk}),
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['next'])
+
+    def test_list_applicants_is_a_single_query(self):
+        with self.assertNumQueries(2):
+            # One aggregate for the ETag and one JOIN for the page.
+            client.get(reverse('application_list', kwargs={'role_id': self.role.pk}))
+
+    def test_list_applicants_conditionally(self):
+        url = reverse('application_list', kwargs={'role_id': self.role.pk})
+        etag = client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.talent_2.weight = 83
+        self.talent_2.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_applicants_after_a_withdrawal(self):
+        url = reverse('application_list', kwargs={'role_id': self.role.pk})
+        response = client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+
+        self.application_2.delete()
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_applicants_pages_with_cursor(self):
+        url = reverse('application_list', kwargs={'role_id': self.role.pk})
+        response = client.get(url, {'page_size': 2})
+        self.assertEqual(
+            [talent['email'] for talent in response.data['results']], ['test@yahoo.com', 'test1@yahoo.com']
+        )
+
+        response = client.get(response.data['next'])
+        self.assertEqual([talent['email'] for talent in response.data['results']], ['test2@yahoo.com'])
+        self.assertIsNone(response.data['next'])
+
+    def test_list_applicants_invalid_cursor(self):
+        response = client.get(reverse('application_list', kwargs={'role_id': self.role.pk}), {'cursor': 'junk'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_applicants_by_score(self):
+        for application in (self.application_1, self.application_2, self.application_3):
+            Application.objects.filter(pk=application.pk).update(
+                **application_snapshot(application.talent, application.role)
+            )
+        unscored = Talent.objects.create(
+            name='Ali Omar', age=35, email='test3@yahoo.com', gender='male', weight=85, height=172
+        )
+        Application.objects.create(talent=unscored, role=self.role)
+
+        url = reverse('application_list', kwargs={'role_id': self.role.pk})
+        response = client.get(url, {'order': 'score', 'page_size': 2})
+        self.assertEqual(
+            [talent['email'] for talent in response.data['results']], ['test1@yahoo.com', 'test2@yahoo.com']
+        )
+        response = client.get(response.data['next'])
+        self.assertEqual([talent['email'] for talent in response.data['results']], ['test@yahoo.com'])
+        self.assertIsNone(response.data['next'])
+
+    def test_list_applicants_invalid_order(self):
+        response = client.get(reverse('application_list', kwargs={'role_id': self.role.pk}), {'order': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_applicants_as_ndjson(self):
+        response = client.get(reverse('application_list', kwargs={'role_id': self.role.pk}), {'export': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            rows, [TalentSerializer(talent).data for talent in (self.talent_1, self.talent_2, self.talent_3)]
+        )
+
+
+class TalentApplicationListTest(TestCase):
+    """Test listing the applications of a talent."""
+
+    def setUp(self):
+        self.company = create_company()
+        self.project = create_project(self.company)
+        self.talent = create_talent()
+        self.roles = [create_role(self.project, name=name) for name in ('pilot', 'navigator', 'engineer')]
+        self.applications = [Application.objects.create(talent=self.talent, role=role) for role in self.roles]
+        self.url = reverse('talent_applications', kwargs={'pk': self.talent.pk})
+
+    def test_list_applications_of_a_talent(self):
+        response = client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        latest = response.data['results'][0]
+        self.assertEqual(latest['id'], self.applications[-1].pk)
+        self.assertEqual(
+            {key: latest[key] for key in ('role_name', 'project_name', 'company', 'company_name')},
+            {
+                'role_name': 'engineer',
+                'project_name': 'Eagle eye',
+                'company': self.company.pk,
+                'company_name': 'seedstars',
+            },
+        )
+        self.assertIsNone(response.data['next'])
+
+    def test_list_applications_pages_with_cursor(self):
+        response = client.get(self.url, {'page_size': 2})
+        self.assertEqual(
+            [application['role_name'] for application in response.data['results']], ['engineer', 'navigator']
+        )
+
+        response = client.get(response.data['next'])
+        self.assertEqual([application['role_name'] for application in response.data['results']], ['pilot'])
+        self.assertIsNone(response.data['next'])
+
+    def test_list_applications_is_a_single_query(self):
+        client.get(self.url)  # Warms the talent cache.
+        with self.assertNumQueries(1):
+            client.get(self.url, {'page_size': 2})
+
+    def test_list_applications_of_unknown_talent(self):
+        response = client.get(reverse('talent_applications', kwargs={'pk': 30}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EligibilityTest(CastingFixtures, TestCase):
+    """Test listing eligible roles for a talent and eligible talents for a role."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_role = Role.objects.create(
+            name='nurse',
+            project=self.project,
+            talent_age=25,
+            talent_gender='female',
+            talent_ethnicity='white',
+            talent_weight=60,
+            talent_height=165,
+        )
+        self.talent_2 = Talent.objects.create(
+            name='Kamal Ezz', age=45, email='test2@yahoo.com', gender='male', ethnicity='white', weight=86, height=173
+        )
+
+    def test_eligible_roles_for_a_talent(self):
+        response = client.get(reverse('talent_eligible_roles', kwargs={'pk': self.talent.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([role['name'] for role in response.data['results']], ['pilot'])
+
+    def test_eligible_talents_for_a_role(self):
+        response = client.get(reverse('role_eligible_talents', kwargs={'role_id': self.role.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([talent['email'] for talent in response.data['results']], ['test@yahoo.com'])
+
+    def test_role_ranges_and_accepted_values(self):
+        payload = {
+            'name': 'captain',
+            'project': self.project.pk,
+            'talent_age': 40,
+            'talent_gender': 'male',
+            'talent_ethnicity': 'white',
+            'talent_weight': 85,
+            'talent_height': 172,
+            'genders': ['male', 'female'],
+            'ethnicities': ['asian'],
+            'age_min': 30,
+            'age_max': 50,
+            'tolerance': 10,
+        }
+        response = client.post(reverse('role_create'), data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([response.data['age_min'], response.data['age_max']], [30, 50])
+        self.assertEqual([response.data['height_min'], response.data['height_max']], [162, 182])
+        self.assertNotIn('genders', response.data)
+        role = Role.objects.get(name='captain')
+        self.assertEqual(role.accepted('ethnicity'), {'white', 'asian'})
+
+        talent_3 = Talent.objects.create(
+            name='Mai Ali', age=31, email='test3@yahoo.com', gender='female', ethnicity='asian', weight=80, height=165
+        )
+        response = client.get(reverse('talent_eligible_roles', kwargs={'pk': self.talent_2.pk}))
+        self.assertEqual([role['name'] for role in response.data['results']], ['captain'])
+        response = client.get(reverse('role_eligible_talents', kwargs={'role_id': role.pk}))
+        self.assertEqual(
+            [talent['email'] for talent in response.data['results']],
+            ['test@yahoo.com', 'test2@yahoo.com', 'test3@yahoo.com'],
+        )
+        response = client.post(
+            reverse('application_create'),
+            data=json.dumps({'talent': talent_3.pk, 'role': role.pk}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_role_range_must_contain_target(self):
+        payload = {
+            'name': 'captain',
+            'project': self.project.pk,
+            'talent_age': 40,
+            'talent_gender': 'male',
+            'talent_ethnicity': 'white',
+            'talent_weight': 85,
+            'talent_height': 172,
+            'age_min': 45,
+        }
+        response = client.post(reverse('role_create'), data=json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('talent_age', response.data)
+
+    def test_eligibility_for_missing_records(self):
+        response = client.get(reverse('talent_eligible_roles', kwargs={'pk': 30}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = client.get(reverse('role_eligible_talents', kwargs={'role_id': 30}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ApplicationBulkCreateTest(CastingFixtures, TestCase):
+    """Test applying a batch of talents for roles."""
+
+    def setUp(self):
+        super().setUp()
+        self.talent_2 = Talent.objects.create(
+            name='Kamal Ezz', age=45, email='test2@yahoo.com', gender='male', ethnicity='asian', weight=86, height=173
+        )
+        self.payload = {
+            'applications': [
+                {'talent': self.talent.pk, 'role': self.role.pk},
+                {'talent': self.talent_2.pk, 'role': self.role.pk},
+                {'talent': 50, 'role': self.role.pk},
+            ]
+        }
+
+    def test_bulk_apply_reports_each_row(self):
+        # Lookups with the role traits, duplicate check, locking capped roles, insert in a savepoint, counting the
+        # applications, then creating and updating the role statistics.
+        with self.assertNumQueries(16):
+            response = client.post(
+                reverse('application_bulk_create'), data=json.dumps(self.payload), content_type='application/json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['accepted', 'declined', 'invalid'])
+        self.assertEqual(results[1]['errors'], ['ethnicity', 'age'])
+        self.assertIn('talent', results[2]['errors'])
+        self.assertEqual(Application.objects.count(), 1)
+        self.assertEqual(Application.objects.first().talent, self.talent)
+
+    def test_bulk_apply_stops_at_capacity(self):
+        self.role.max_applications = 1
+        self.role.save()
+        talent_3 = Talent.objects.create(
+            name='Ali Omar', age=35, email='test3@yahoo.com', gender='male', ethnicity='white', weight=85, height=172
+        )
+        payload = {
+            'applications': [
+                {'talent': self.talent.pk, 'role': self.role.pk},
+                {'talent': talent_3.pk, 'role': self.role.pk},
+            ]
+        }
+        response = client.post(
+            reverse('application_bulk_create'), data=json.dumps(payload), content_type='application/json'
+        )
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['accepted', 'declined'])
+        self.assertEqual(results[1]['errors'], ['max_applications'])
+        self.assertEqual(Application.objects.get().talent, self.talent)
+        self.role.refresh_from_db()
+        self.assertEqual(self.role.application_count, 1)
+        self.assertFalse(self.role.is_open)
+
+    def test_bulk_apply_skips_duplicates(self):
+        Application.objects.create(talent=self.talent, role=self.role)
+        payload = {'applications': [{'talent': self.talent.pk, 'role': self.role.pk}] * 2}
+        response = client.post(
+            reverse('application_bulk_create'), data=json.dumps(payload), content_type='application/json'
+        )
+        self.assertEqual([result['status'] for result in response.data['results']], ['invalid', 'invalid'])
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_bulk_apply_counts_only_inserted_rows(self):
+        self.role.max_applications = 2
+        self.role.save()
+        lock_places = capacity.lock_places
+
+        def race(role_ids):
+            # A concurrent request inserts the same application after this batch checked for duplicates.
+            Application.objects.create(talent=self.talent, role=self.role)
+            return lock_places(role_ids)
+
+        with mock.patch.object(capacity, 'lock_places', side_effect=race):
+            response = client.post(
+                reverse('application_bulk_create'), data=json.dumps(self.payload), content_type='application/json'
+            )
+        self.assertEqual(response.data['results'][0]['status'], 'invalid')
+        self.assertEqual(Application.objects.count(), 1)
+        self.role.refresh_from_db()
+        self.assertEqual(self.role.application_count, 0)
+        self.assertTrue(self.role.is_open)
+
+    def test_bulk_apply_invalid_payload(self):
+        response = client.post(
+            reverse('application_bulk_create'), data=json.dumps({'applications': []}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Application.objects.count(), 0)
+
+
+@override_settings(QUEUE_APPLICATIONS=True)
+class ApplicationQueueTest(CastingFixtures, TestCase):
+    """Test queuing applications for the workers."""
+
+    def setUp(self):
+        super().setUp()
+        self.payload = {'talent': self.talent.pk, 'role': self.role.pk}
+
+    def apply(self, payload):
+        return client.post(reverse('application_create'), data=json.dumps(payload), content_type='application/json')
+
+    def test_queued_apply(self):
+        response = self.apply(self.payload)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ApplicationTicket.PENDING)
+        self.assertEqual(response['Location'], reverse('application_ticket', kwargs={'pk': response.data['id']}))
+        self.assertEqual(Application.objects.count(), 0)
+
+        call_command('process_application_queue', once=True, stdout=StringIO())
+
+        ticket = client.get(response['Location'])
+        self.assertEqual(ticket.status_code, status.HTTP_200_OK)
+        self.assertEqual(ticket.data['status'], ApplicationTicket.ACCEPTED)
+        self.assertIsNotNone(ticket.data['processed_at'])
+        self.assertEqual(Application.objects.get().talent, self.talent)
+        self.assertEqual(RoleStats.objects.get(role=self.role).applicant_count, 1)
+
+    def test_queued_duplicate(self):
+        first, second = self.apply(self.payload), self.apply(self.payload)
+        call_command('process_application_queue', once=True, stdout=StringIO())
+
+        self.assertEqual(ApplicationTicket.objects.get(pk=first.data['id']).status, ApplicationTicket.ACCEPTED)
+        duplicate = ApplicationTicket.objects.get(pk=second.data['id'])
+        self.assertEqual(duplicate.status, ApplicationTicket.INVALID)
+        self.assertEqual(duplicate.errors, {'non_field_errors': ['This talent already applied for this role']})
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_declined_before_queuing(self):
+        response = self.apply({'talent': self.talent.pk, 'role': self.role.pk + 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.talent.age = 50
+        self.talent.save()
+        response = self.apply(self.payload)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ApplicationTicket.objects.count(), 0)
+
+    def test_claims_do_not_overlap(self):
+        other = Talent.objects.create(
+            name='Kamal Ezz', age=35, email='test2@yahoo.com', gender='male', ethnicity='white', weight=86, height=173
+        )
+        self.apply(self.payload)
+        self.apply({'talent': other.pk, 'role': self.role.pk})
+
+        first, second = claim_tickets(1), claim_tickets(5)
+        self.assertEqual([len(first), len(second)], [1, 1])
+        self.assertNotEqual(first[0].pk, second[0].pk)
+        self.assertNotEqual(first[0].claim, second[0].claim)
+        self.assertEqual(claim_tickets(5), [])
+
+        self.assertEqual(release_stale_tickets(timeout=-1), 2)
+        self.assertEqual(len(claim_tickets(5)), 2)
+
+    def test_requeued_batch_still_being_processed(self):
+        response = self.apply(self.payload)
+        slow = claim_tickets(5)
+        # The first worker is slower than the stale timeout, a second one takes its batch over.
+        self.assertEqual(release_stale_tickets(timeout=-1), 1)
+        self.assertEqual(process_tickets(claim_tickets(5))[0]['status'], ApplicationTicket.ACCEPTED)
+
+        self.assertEqual(process_tickets(slow), [])
+        ticket = ApplicationTicket.objects.get(pk=response.data['id'])
+        self.assertEqual(ticket.status, ApplicationTicket.ACCEPTED)
+        self.assertIsNone(ticket.errors)
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_worker_survives_database_errors(self):
+        stdout, stderr = StringIO(), StringIO()
+        work = mock.patch(
+            'casting_app.management.commands.process_application_queue.Command.work',
+            side_effect=[OperationalError('server closed the connection unexpectedly'), True, KeyboardInterrupt],
+        )
+        closes = mock.patch('casting_app.management.commands.process_application_queue.close_old_connections')
+        with work, closes as close_old_connections, mock.patch('time.sleep'):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('process_application_queue', stdout=stdout, stderr=stderr)
+        self.assertIn('server closed the connection unexpectedly', stderr.getvalue())
+        self.assertEqual(close_old_connections.call_count, 3)
+
+
+class AsyncReadTest(CastingFixtures, TransactionTestCase):
+    """Test the async talent and applicant list endpoints.
+
+    Their queries run on executor threads with their own connections, which only see committed rows.
+    """
+
+    def setUp(self):
+        super().setUp()
+        Application.objects.create(talent=self.talent, role=self.role)
+
+    async def test_get_talent(self):
+        response = await AsyncClient().get(reverse('talent_get_async', kwargs={'pk': self.talent.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), dict(TalentSerializer(self.talent).data))
+
+    async def test_get_invalid_talent(self):
+        response = await AsyncClient().get(reverse('talent_get_async', kwargs={'pk': 30}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_list_applicants(self):
+        response = await AsyncClient().get(reverse('application_list_async', kwargs={'role_id': self.role.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'next': None, 'results': [dict(TalentSerializer(self.talent).data)]})
+
+    def test_middleware_runs_in_async_mode(self):
+        # A single sync-only middleware would send every ASGI request through one shared thread.
+        for path in settings.MIDDLEWARE:
+            with self.subTest(middleware=path):
+                self.assertTrue(getattr(import_string(path), 'async_capable', False))
+
+    async def test_list_applicants_like_the_sync_view(self):
+        url = reverse('application_list_async', kwargs={'role_id': self.role.pk})
+        sync_url = reverse('application_list', kwargs={'role_id': self.role.pk})
+        for query in ('order=score', 'order=nearest'):
+            with self.subTest(query=query):
+                response = await AsyncClient().get(f'{url}?{query}')
+                expected = await sync_to_async(client.get)(f'{sync_url}?{query}')
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_list_applicants_conditionally(self):
+        url = reverse('application_list_async', kwargs={'role_id': self.role.pk})
+        etag = (await AsyncClient().get(url))['ETag']
+        # Django 3.2's AsyncClient sends extra keyword arguments as raw header names.
+        response = await AsyncClient().get(url, **{'if-none-match': etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    async def test_executor_threads_release_their_connections(self):
+        url = reverse('application_list_async', kwargs={'role_id': self.role.pk})
+        with mock.patch('casting_app.async_views.close_old_connections') as close_old_connections:
+            await AsyncClient().get(url)
+        # Before and after the queries, like request_started and request_finished.
+        self.assertEqual(close_old_connections.call_count, 2)
+
+    async def test_list_applicants_invalid_cursor(self):
+        url = reverse('application_list_async', kwargs={'role_id': self.role.pk})
+        response = await AsyncClient().get(f'{url}?cursor=junk')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TalentSearchTest(TestCase):
+    """Test searching talents."""
+
+    def setUp(self):
+        self.talent_1 = Talent.objects.create(
+            name='Mohamed Mousa',
+            age=33,
+            email='test@yahoo.com',
+            gender='male',
+            ethnicity='white',
+            weight=88,
+            height=170,
+        )
+        self.talent_2 = Talent.objects.create(
+            name='Mohamed Ahmed',
+            age=28,
+            email='test1@yahoo.com',
+            gender='male',
+            ethnicity='white',
+            weight=84,
+            height=175,
+        )
+        self.talent_3 = Talent.objects.create(
+            name='Kamal Ezz', age=38, email='test2@yahoo.com', gender='male', ethnicity='asian', weight=86, height=173
+        )
+        self.talent_4 = Talent.objects.create(
+            name='Mona Zaki', age=30, email='test3@yahoo.com', gender='female', ethnicity='white', weight=60, height=165
+        )
+
+    def search(self, **params):
+        response = client.get(reverse('talent_search'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [talent['email'] for talent in response.data['results']], response.data['next']
+
+    def test_filter_by_gender_and_ethnicity(self):
+        emails, _ = self.search(gender='male', ethnicity='white')
+        self.assertEqual(emails, ['test@yahoo.com', 'test1@yahoo.com'])
+
+    def test_filter_by_ranges(self):
+        emails, _ = self.search(age_min=30, age_max=40, height_max=172)
+        self.assertEqual(emails, ['test@yahoo.com', 'test3@yahoo.com'])
+
+    def test_ordering_and_keyset_pages(self):
+        emails, next_page = self.search(gender='male', ordering='-age', page_size=2)
+        self.assertEqual(emails, ['test2@yahoo.com', 'test@yahoo.com'])
+
+        response = client.get(next_page)
+        self.assertEqual([talent['email'] for talent in response.data['results']], ['test1@yahoo.com'])
+        self.assertIsNone(response.data['next'])
+
+    def test_search_requires_an_indexed_filter(self):
+        response = client.get(reverse('talent_search'), {'ethnicity': 'white'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ordering(self):
+        response = client.get(reverse('talent_search'), {'gender': 'male', 'ordering': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RoleStatsTest(CastingFixtures, TestCase):
+    """Test the per-role applicant statistics."""
+
+    def setUp(self):
+        super().setUp()
+        self.talent_2 = Talent.objects.create(
+            name='Mohamed Ahmed',
+            age=37,
+            email='test1@yahoo.com',
+            gender='male',
+            ethnicity='white',
+            weight=84,
+            height=175,
+        )
+
+    def apply(self):
+        client.post(
+            reverse('application_create'),
+            data=json.dumps({'talent': self.talent.pk, 'role': self.role.pk}),
+            content_type='application/json',
+        )
+        client.post(
+            reverse('application_bulk_create'),
+            data=json.dumps({'applications': [{'talent': self.talent_2.pk, 'role': self.role.pk}]}),
+            content_type='application/json',
+        )
+
+    def test_stats_follow_applications(self):
+        self.apply()
+        with self.assertNumQueries(1):
+            response = client.get(reverse('role_stats', kwargs={'role_id': self.role.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['applicant_count'], 2)
+        self.assertEqual(response.data['age'], {'min': 33, 'max': 37, 'mean': 35, 'histogram': {'30': 1, '35': 1}})
+        self.assertEqual(response.data['height']['histogram'], {'170': 1, '175': 1})
+        self.assertEqual(list(response.data['daily_applications'].values()), [2])
+
+    def test_stats_of_a_role_without_applicants(self):
+        response = client.get(reverse('role_stats', kwargs={'role_id': self.role.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['applicant_count'], 0)
+        self.assertIsNone(response.data['weight']['mean'])
+
+    def test_stats_of_a_missing_role(self):
+        response = client.get(reverse('role_stats', kwargs={'role_id': 30}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_first_applications_racing_for_the_stats(self):
+        select_for_update = RoleStats.objects.select_for_update
+
+        def race():
+            if RoleStats.objects.exists():
+                return select_for_update()
+            # A concurrent first application to the role creates its statistics right after this one missed them.
+            RoleStats.objects.create(role=self.role)
+            return RoleStats.objects.none()
+
+        with mock.patch.object(stats.RoleStats.objects, 'select_for_update', side_effect=race):
+            response = client.post(
+                reverse('application_create'),
+                data=json.dumps({'talent': self.talent.pk, 'role': self.role.pk}),
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Application.objects.count(), 1)
+        self.assertEqual(RoleStats.objects.get(role=self.role).applicant_count, 1)
+
+    def test_stats_follow_withdrawals(self):
+        self.apply()
+        Application.objects.get(talent=self.talent_2).delete()
+        response = client.get(reverse('role_stats', kwargs={'role_id': self.role.pk}))
+        self.assertEqual(response.data['applicant_count'], 1)
+        self.assertEqual(response.data['age'], {'min': 33, 'max': 33, 'mean': 33, 'histogram': {'30': 1}})
+        self.assertEqual(list(response.data['daily_applications'].values()), [1])
+
+        Application.objects.get().delete()
+        response = client.get(reverse('role_stats', kwargs={'role_id': self.role.pk}))
+        self.assertEqual(response.data['applicant_count'], 0)
+        self.assertEqual(response.data['height'], {'min': None, 'max': None, 'mean': None, 'histogram': {}})
+
+    def test_rebuild_matches_incremental_stats(self):
+        self.apply()
+        expected = client.get(reverse('role_stats', kwargs={'role_id': self.role.pk})).data
+        RoleStats.objects.all().delete()
+
+        call_command('rebuild_role_stats', stdout=StringIO())
+        self.assertEqual(client.get(reverse('role_stats', kwargs={'role_id': self.role.pk})).data, expected)
+
+
+class TalentImportTest(TestCase):
+    """Test importing talents from CSV and NDJSON bodies."""
+
+    def setUp(self):
+        self.talent = Talent.objects.create(
+            name='Mohamed Mousa', age=33, email='test@yahoo.com', gender='male', weight=88, height=170
+        )
+
+    def test_import_csv_upserts_on_email(self):
+        body = (
+            'name,email,phone_number,age,gender,ethnicity,weight,height\r\n'
+            'Mohamed Mousa,test@yahoo.com,0100,34,male,white,87,170\r\n'
+            'Mona Zaki,test3@yahoo.com,0101,30,female,white,60,165\r\n'
+            'Kamal Ezz,not-an-email,0102,thirty,male,asian,86,173\r\n'
+        )
+        response = client.post(reverse('talent_import'), data=body, content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual([error['row'] for error in response.data['errors']], [3])
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'email', 'age'})
+
+        self.talent.refresh_from_db()
+        self.assertEqual(self.talent.age, 34)
+        self.assertEqual(Talent.objects.count(), 2)
+
+    def test_import_ndjson(self):
+        rows = [
+            {
+                'name': 'Mona Zaki',
+                'email': 'test3@yahoo.com',
+                'phone_number': '0101',
+                'age': 30,
+                'gender': 'female',
+                'ethnicity': 'white',
+                'weight': 60,
+                'height': 165,
+            },
+            ['not', 'an', 'object'],
+        ]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n{broken\n'
+        response = client.post(reverse('talent_import'), data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+
+    def test_import_updates_cached_talents(self):
+        client.get(reverse('talent_get_update', kwargs={'pk': self.talent.pk}))
+        body = 'name,email,phone_number,age,gender,ethnicity,weight,height\nMohamed,test@yahoo.com,0100,40,male,white,87,170\n'
+        client.post(reverse('talent_import'), data=body, content_type='text/csv')
+        response = client.get(reverse('talent_get_update', kwargs={'pk': self.talent.pk}))
+        self.assertEqual(response.data['age'], 40)
+
+    def test_import_repeated_email(self):
+        talent = {'phone_number': '0101', 'age': 30, 'gender': 'female', 'ethnicity': 'white', 'weight': 60}
+        rows = [
+            dict(talent, name='Mona Zaki', email='test3@yahoo.com', height=165),
+            dict(talent, name='Yousra', email='test4@yahoo.com', height=166),
+            dict(talent, name='Mona Zaki Ahmed', email='test3@yahoo.com', height=167),
+        ]
+        body = ''.join(json.dumps(row) + '\n' for row in rows)
+        response = client.post(reverse('talent_import'), data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['errors'], [{'row': 1, 'errors': {'email': ['Replaced by row 3']}}])
+        self.assertEqual(Talent.objects.get(email='test3@yahoo.com').name, 'Mona Zaki Ahmed')
+
+    def test_import_retries_a_chunk_racing_another_writer(self):
+        body = 'name,email,phone_number,age,gender,ethnicity,weight,height\nMona Zaki,test3@yahoo.com,0101,30,female,white,60,165\n'
+        upsert = importers._upsert
+
+        def race(rows_by_email):
+            if race.lost:
+                return upsert(rows_by_email)
+            # Another writer inserted one of the emails after this chunk read the existing talents.
+            race.lost = True
+            raise IntegrityError('UNIQUE constraint failed: casting_app_talent.email')
+
+        race.lost = False
+        with mock.patch.object(importers, '_upsert', side_effect=race) as attempts:
+            response = client.post(reverse('talent_import'), data=body, content_type='text/csv')
+        self.assertEqual(attempts.call_count, 2)
+        self.assertEqual(response.data['created'], 1)
+
+    def test_import_invalid_utf8(self):
+        response = client.post(reverse('talent_import'), data=b'\xff\xfe', content_type='text/csv')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('not valid UTF-8', response.data['detail'])
+
+    def test_import_unsupported_format(self):
+        response = client.post(reverse('talent_import'), data='{}', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+
+class ApplicationExportTest(CastingFixtures, TestCase):
+    """Test exporting the applications of a project or a company."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_project = Project.objects.create(
+            company=self.company, name="Falcon", description="test description", location="Giza"
+        )
+        self.other_role = Role.objects.create(
+            name='officer',
+            project=self.other_project,
+            talent_age=35,
+            talent_gender='male',
+            talent_ethnicity='white',
+            talent_weight=85,
+            talent_height=172,
+        )
+        self.application = Application.objects.create(talent=self.talent, role=self.role)
+        Application.objects.create(talent=self.talent, role=self.other_role)
+
+    def test_export_project_as_csv(self):
+        response = client.get(reverse('project_application_export', kwargs={'project_id': self.project.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('application_id,datetime_applied,company_id,company,project_id'))
+        self.application.refresh_from_db()
+        expected = [
+            self.application.pk,
+            self.application.datetime_applied,
+            self.company.pk,
+            'seedstars',
+            self.project.pk,
+            'Eagle eye',
+            self.role.pk,
+            'pilot',
+            self.talent.pk,
+            'Mohamed Mousa',
+            'test@yahoo.com',
+            self.talent.phone_number,
+            33,
+            'male',
+            'white',
+            88.0,
+            170.0,
+            self.application.match_score,
+        ]
+        self.assertEqual(next(csv.reader(lines[1:])), ['' if value is None else str(value) for value in expected])
+
+    def test_export_company_as_ndjson(self):
+        url = reverse('company_application_export', kwargs={'company_id': self.company.pk})
+        response = client.get(url, {'export': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['role'] for row in rows], ['pilot', 'officer'])
+        self.assertEqual(rows[0]['company'], 'seedstars')
+        self.assertEqual(rows[0]['height'], 170)
+
+    def test_export_missing_project(self):
+        response = client.get(reverse('project_application_export', kwargs={'project_id': 30}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_invalid_format(self):
+        url = reverse('project_application_export', kwargs={'project_id': self.project.pk})
+        response = client.get(url, {'export': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
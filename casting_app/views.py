@@ -1,15 +1,61 @@
-from rest_framework import generics
+import json
+import math
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Prefetch, Q, When
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.views.decorators.http import condition
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ParseError, UnsupportedMediaType, ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.views import APIView
 
-from .models import Application, Project, Role, Talent
+from . import cache, exports, geo, search
+from .conditional import application_list_etag, talent_etag, talent_last_modified
+from .fast_serializers import ValuesListMixin, ValuesSerializer
+from .importers import decode_lines, import_talents, parse_rows
+from .matching import eligible_roles, eligible_talents
+from .models import (
+    Application,
+    ApplicationTicket,
+    Company,
+    Project,
+    Role,
+    RoleStats,
+    Talent,
+)
+from .pagination import (
+    ApplicationCursorPagination,
+    KeysetPagination,
+    TalentApplicationPagination,
+)
+from .renderers import FastJSONRenderer
 from .serializers import (
+    ApplicationBulkSerializer,
     ApplicationSerializer,
+    ApplicationTicketSerializer,
+    CompanyDetailSerializer,
     CompanySerializer,
+    ProjectDetailSerializer,
     ProjectSerializer,
+    RoleDetailSerializer,
+    RoleNearbySerializer,
+    RoleSearchSerializer,
     RoleSerializer,
+    RoleStatsSerializer,
+    TalentApplicationSerializer,
+    TalentSearchSerializer,
     TalentSerializer,
 )
+from .talent_search import ORDERING_FIELDS, keyset_ordering, search_lookups
 
 
 class TalentCreate(generics.CreateAPIView):
@@ -18,6 +64,29 @@ class TalentCreate(generics.CreateAPIView):
     serializer_class = TalentSerializer
 
 
+class TalentImport(APIView):
+    """Import talents from a CSV or NDJSON request body, upserting on email."""
+
+    content_types = {'text/csv': 'csv', 'application/x-ndjson': 'ndjson'}
+
+    def post(self, request):
+        """Override post method."""
+
+        file_format = self.content_types.get(request.content_type.split(';')[0].strip())
+        if file_format is None:
+            raise UnsupportedMediaType(request.content_type)
+
+        # Read the body line by line rather than through request.data, which would load it whole.
+        try:
+            report = import_talents(parse_rows(decode_lines(request._request), file_format))
+        except UnicodeDecodeError as exc:
+            # Chunks before the error are imported already, posting the fixed body again upserts them.
+            raise ParseError(f'Request body is not valid UTF-8: {exc.reason}')
+
+        return Response(report)
+
+
+@method_decorator(condition(etag_func=talent_etag, last_modified_func=talent_last_modified), name='get')
 class TalentRetrieveUpdate(generics.RetrieveUpdateAPIView):
     """Get a talent and update it."""
 
@@ -25,6 +94,63 @@ class TalentRetrieveUpdate(generics.RetrieveUpdateAPIView):
     queryset = Talent.objects.all()
     lookup_field = 'pk'
 
+    def get_object(self):
+        """Serve reads from the talent cache, writes always start from the database row."""
+
+        if self.request.method not in permissions.SAFE_METHODS:
+            return super().get_object()
+        try:
+            talent = cache.get_talent(self.kwargs['pk'])
+        except Talent.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(self.request, talent)
+        return talent
+
+
+class TalentEligibleRoles(ValuesListMixin, generics.ListAPIView):
+    """List the roles a talent is eligible to apply for."""
+
+    serializer_class = RoleSerializer
+    values_serializer = ValuesSerializer(RoleSerializer)
+
+    def get_queryset(self):
+        return eligible_roles(get_object_or_404(Talent, pk=self.kwargs['pk']))
+
+
+class TalentApplicationList(generics.ListAPIView):
+    """List the applications of a talent with their role, project and company, newest first."""
+
+    serializer_class = TalentApplicationSerializer
+    pagination_class = TalentApplicationPagination
+
+    def get_queryset(self):
+        try:
+            talent = cache.get_talent(self.kwargs['pk'])
+        except Talent.DoesNotExist:
+            raise Http404
+        return Application.objects.filter(talent=talent).select_related('role__project__company')
+
+
+class TalentSearch(ValuesListMixin, generics.ListAPIView):
+    """Search talents by gender, ethnicity and age, height and weight ranges."""
+
+    serializer_class = TalentSerializer
+    values_serializer = ValuesSerializer(TalentSerializer)
+    values_keys = ('id',) + ORDERING_FIELDS
+    pagination_class = KeysetPagination
+
+    @cached_property
+    def filters(self):
+        serializer = TalentSearchSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_queryset(self):
+        return Talent.objects.filter(**search_lookups(self.filters))
+
+    def get_keyset_ordering(self):
+        return keyset_ordering(self.filters['ordering'])
+
 
 class CompanyCreate(generics.CreateAPIView):
     """Create a company."""
@@ -32,6 +158,26 @@ class CompanyCreate(generics.CreateAPIView):
     serializer_class = CompanySerializer
 
 
+class CompanyBrowseMixin:
+    """Companies with their projects and role names in three queries, whatever their number."""
+
+    serializer_class = CompanyDetailSerializer
+    queryset = Company.objects.prefetch_related(
+        Prefetch('project_set', queryset=Project.objects.order_by('id')),
+        Prefetch('project_set__role_set', queryset=Role.objects.only('id', 'name', 'project_id').order_by('id')),
+    )
+
+
+class CompanyList(CompanyBrowseMixin, generics.ListAPIView):
+    """List companies with their projects."""
+
+    pagination_class = KeysetPagination
+
+
+class CompanyRetrieve(CompanyBrowseMixin, generics.RetrieveAPIView):
+    """Get a company with its projects."""
+
+
 class ProjectCreate(generics.CreateAPIView):
     """Create a project."""
 
@@ -39,6 +185,25 @@ class ProjectCreate(generics.CreateAPIView):
     queryset = Project.objects.all()
 
 
+class ProjectBrowseMixin:
+    """Projects with their company and roles in three queries, whatever their number."""
+
+    serializer_class = ProjectDetailSerializer
+    queryset = Project.objects.select_related('company').prefetch_related(
+        Prefetch('role_set', queryset=Role.objects.order_by('id')), 'role_set__traits'
+    )
+
+
+class ProjectList(ProjectBrowseMixin, generics.ListAPIView):
+    """List projects with their roles."""
+
+    pagination_class = KeysetPagination
+
+
+class ProjectRetrieve(ProjectBrowseMixin, generics.RetrieveAPIView):
+    """Get a project with its roles."""
+
+
 class RoleCreate(generics.CreateAPIView):
     """Create a role and assign it to a project."""
 
@@ -46,22 +211,239 @@ class RoleCreate(generics.CreateAPIView):
     queryset = Role.objects.all()
 
 
+class RoleBrowseMixin:
+    """Roles with their project, company and accepted traits in two queries, whatever their number."""
+
+    serializer_class = RoleDetailSerializer
+    queryset = Role.objects.select_related('project__company').prefetch_related('traits')
+
+
+class OpenRoleList(RoleBrowseMixin, generics.ListAPIView):
+    """List the roles still open to applications."""
+
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_open=True)
+
+
+class RoleRetrieve(RoleBrowseMixin, generics.RetrieveAPIView):
+    """Get a role with its accepted genders and ethnicities."""
+
+
+class RoleNearby(RoleBrowseMixin, generics.GenericAPIView):
+    """List the open roles of projects within ``radius`` kilometres of ``lat``/``lon``, nearest first.
+
+    Projects are pruned to the geohash cells covering the circle through the geohash index. The database then
+    filters, orders and limits the roles on an equirectangular distance, close to the great-circle one at these
+    radii, which is computed exactly for the returned roles only.
+    """
+
+    def get_nearby(self, lat, lon, radius):
+        cells = geo.covering_cells(lat, lon, radius)
+        in_cells = reduce(or_, (Q(project__geohash__gte=cell, project__geohash__lt=cell + '~') for cell in cells))
+        # Degrees of longitude shrink with the cosine of the latitude.
+        lon_scale = math.cos(math.radians(lat))
+        lat_offset = F('project__latitude') - lat
+        # Across the antimeridian the short way round is 360 degrees off the raw difference.
+        lon_delta = F('project__longitude') - lon
+        lon_delta = Case(
+            When(project__longitude__gt=lon + 180, then=lon_delta - 360),
+            When(project__longitude__lt=lon - 180, then=lon_delta + 360),
+            default=lon_delta,
+            output_field=FloatField(),
+        )
+        lon_offset = lon_delta * lon_scale
+        return (
+            self.get_queryset()
+            .filter(in_cells, is_open=True)
+            .alias(
+                distance=ExpressionWrapper(lat_offset * lat_offset + lon_offset * lon_offset, output_field=FloatField())
+            )
+            .filter(distance__lte=(radius / geo.KM_PER_DEGREE) ** 2)
+            .order_by('distance', 'id')
+        )
+
+    def get(self, request):
+        """Override get method."""
+
+        params = RoleNearbySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        lat, lon, radius = (params.validated_data[name] for name in ('lat', 'lon', 'radius'))
+
+        roles = list(self.get_nearby(lat, lon, radius)[: params.validated_data['limit']])
+        data = self.get_serializer(roles, many=True).data
+        results = [
+            {**row, 'distance_km': round(geo.distance_km(lat, lon, role.project.latitude, role.project.longitude), 3)}
+            for role, row in zip(roles, data)
+        ]
+        return Response({'results': results})
+
+
+class RoleSearch(RoleBrowseMixin, generics.GenericAPIView):
+    """Search open roles by keywords in their name and their project's name, location and description.
+
+    Results are ranked from the full-text index of ``casting_app.search``, best match first, and paged with ``page``.
+    """
+
+    def get(self, request):
+        """Override get method."""
+
+        params = RoleSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page, page_size = params.validated_data['page'], params.validated_data['page_size']
+
+        matches = search.search_roles(params.validated_data['q'], page_size + 1, (page - 1) * page_size)
+        next_link = None
+        if len(matches) > page_size:
+            matches = matches[:page_size]
+            next_link = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+
+        roles = self.get_queryset().in_bulk([role_id for role_id, _ in matches])
+        ranked = [(roles[role_id], rank) for role_id, rank in matches if role_id in roles]
+        data = self.get_serializer([role for role, _ in ranked], many=True).data
+        results = [{**role, 'rank': round(rank, 4)} for role, (_, rank) in zip(data, ranked)]
+        return Response({'next': next_link, 'results': results})
+
+
+class RoleEligibleTalents(ValuesListMixin, generics.ListAPIView):
+    """List the talents eligible to apply for a role."""
+
+    serializer_class = TalentSerializer
+    values_serializer = ValuesSerializer(TalentSerializer)
+
+    def get_queryset(self):
+        return eligible_talents(get_object_or_404(Role, pk=self.kwargs['role_id']))
+
+
 class ApplicationCreate(generics.CreateAPIView):
-    """Apply for a role."""
+    """Apply for a role.
+
+    With ``QUEUE_APPLICATIONS`` on, the application is only checked against the role criteria and queued: the
+    response is a 202 with a ticket to poll while ``process_application_queue`` workers insert it.
+    """
 
     serializer_class = ApplicationSerializer
     queryset = Application.objects.all()
 
+    def create(self, request, *args, **kwargs):
+        """Override create method."""
+
+        if not settings.QUEUE_APPLICATIONS:
+            return super().create(request, *args, **kwargs)
+
+        serializer = ApplicationTicketSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ticket = serializer.save()
+        location = reverse('application_ticket', kwargs={'pk': ticket.pk})
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+
+class ApplicationTicketRetrieve(generics.RetrieveAPIView):
+    """Poll a queued application."""
+
+    serializer_class = ApplicationTicketSerializer
+    queryset = ApplicationTicket.objects.all()
 
-class ApplicationList(APIView):
-    """Show talents who applies for a certain role."""
+
+class ApplicationBulkCreate(APIView):
+    """Apply a batch of talents for roles, reporting acceptance per row."""
+
+    def post(self, request):
+        """Override post method."""
+
+        serializer = ApplicationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+
+        return Response({'results': results}, status=status.HTTP_201_CREATED)
+
+
+@method_decorator(condition(etag_func=application_list_etag), name='get')
+class ApplicationList(generics.GenericAPIView):
+    """Show talents who applies for a certain role.
+
+    Pages are keyed on ``(datetime_applied, id)``, or on the match score with ``?order=score`` to list the closest
+    matches first. ``?export=ndjson`` streams every applicant instead.
+    """
+
+    serializer_class = TalentSerializer
+    pagination_class = ApplicationCursorPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    values_serializer = ValuesSerializer(TalentSerializer, source='talent')
+    orders = ('applied', 'score')
+
+    @cached_property
+    def order(self):
+        order = self.request.query_params.get('order', 'applied')
+        if order not in self.orders:
+            raise ValidationError({'order': [f'Choose one of {", ".join(self.orders)}']})
+        return order
+
+    def get_queryset(self):
+        applications = Application.objects.filter(role_id=self.kwargs['role_id'])
+        if self.order == 'score':
+            # Applications predating the snapshot have no score to rank on.
+            applications = applications.filter(match_score__isnull=False)
+        return applications
+
+    def get_keyset_ordering(self):
+        if self.order == 'score':
+            return self.pagination_class.score_ordering
+        return self.pagination_class.ordering
+
+    def get_rows(self):
+        ordering = self.get_keyset_ordering()
+        return self.values_serializer.values(self.get_queryset(), *(field.lstrip('-') for field in ordering))
+
+    def get_page(self):
+        """The requested page of applicants, also served by ``async_views.application_list``."""
+
+        page = self.paginate_queryset(self.get_rows())
+        return self.get_paginated_response(self.values_serializer.to_representation(page))
 
     def get(self, request, role_id):
         """Override get method."""
 
-        role = Role.objects.get(id=role_id)
-        applicants = Application.objects.filter(role=role).values_list('talent__id', flat=True)
-        talents = Talent.objects.filter(id__in=applicants)
-        serializer = TalentSerializer(talents, many=True)
+        if request.query_params.get('export') == 'ndjson':
+            rows = self.get_rows().order_by(*self.get_keyset_ordering()).iterator(chunk_size=2000)
+            return StreamingHttpResponse(
+                (json.dumps(talent) + '\n' for talent in self.values_serializer.iter_representation(rows)),
+                content_type='application/x-ndjson',
+            )
+
+        return self.get_page()
+
+
+class RoleStatsRetrieve(generics.RetrieveAPIView):
+    """Show the applicant statistics of a role."""
+
+    serializer_class = RoleStatsSerializer
+    queryset = RoleStats.objects.all()
+    lookup_url_kwarg = 'role_id'
+
+    def get_object(self):
+        """Roles nobody applied for yet have no statistics row."""
+
+        try:
+            return super().get_object()
+        except Http404:
+            return RoleStats(role=get_object_or_404(Role, pk=self.kwargs['role_id']))
+
+
+class ApplicationExport(APIView):
+    """Stream every application of a project or a company as CSV (default) or NDJSON."""
+
+    def get(self, request, project_id=None, company_id=None):
+        """Override get method."""
+
+        if project_id is not None:
+            get_object_or_404(Project, pk=project_id)
+        if company_id is not None:
+            get_object_or_404(Company, pk=company_id)
+        file_format = request.query_params.get('export', 'csv')
+        if file_format not in exports.FORMATS:
+            raise ValidationError({'export': [f'Choose one of {", ".join(exports.FORMATS)}']})
 
-        return Response(serializer.data)
+        rows = exports.export_rows(project_id=project_id, company_id=company_id)
+        return StreamingHttpResponse(exports.render(rows, file_format), content_type=exports.CONTENT_TYPES[file_format])
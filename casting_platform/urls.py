@@ -19,14 +19,33 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from casting_app import async_views
+from casting_app.metrics import metrics_view
 from casting_app.views import (
+    ApplicationBulkCreate,
     ApplicationCreate,
+    ApplicationExport,
     ApplicationList,
+    ApplicationTicketRetrieve,
     CompanyCreate,
+    CompanyList,
+    CompanyRetrieve,
+    OpenRoleList,
     ProjectCreate,
+    ProjectList,
+    ProjectRetrieve,
     RoleCreate,
+    RoleEligibleTalents,
+    RoleNearby,
+    RoleRetrieve,
+    RoleSearch,
+    RoleStatsRetrieve,
+    TalentApplicationList,
     TalentCreate,
+    TalentEligibleRoles,
+    TalentImport,
     TalentRetrieveUpdate,
+    TalentSearch,
 )
 
 schema_view = get_schema_view(
@@ -47,13 +66,42 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('api-auth/', include('rest_framework.urls', namespace='rest_framework')),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
     path('api/talent/create/', TalentCreate.as_view(), name='talent_create'),
+    path('api/talent/import/', TalentImport.as_view(), name='talent_import'),
+    path('api/talent/search/', TalentSearch.as_view(), name='talent_search'),
     path('api/talent/<int:pk>/', TalentRetrieveUpdate.as_view(), name='talent_get_update'),
+    path('api/talent/<int:pk>/async/', async_views.talent_retrieve, name='talent_get_async'),
+    path('api/talent/<int:pk>/eligible-roles/', TalentEligibleRoles.as_view(), name='talent_eligible_roles'),
+    path('api/talent/<int:pk>/applications/', TalentApplicationList.as_view(), name='talent_applications'),
+    path('api/company/', CompanyList.as_view(), name='company_list'),
     path('api/company/create/', CompanyCreate.as_view(), name='company_create'),
+    path('api/company/<int:pk>/', CompanyRetrieve.as_view(), name='company_get'),
+    path('api/project/', ProjectList.as_view(), name='project_list'),
     path('api/project/create/', ProjectCreate.as_view(), name='project_create'),
+    path('api/project/<int:pk>/', ProjectRetrieve.as_view(), name='project_get'),
+    path(
+        'api/company/<int:company_id>/applications/export/',
+        ApplicationExport.as_view(),
+        name='company_application_export',
+    ),
+    path(
+        'api/project/<int:project_id>/applications/export/',
+        ApplicationExport.as_view(),
+        name='project_application_export',
+    ),
+    path('api/role/', OpenRoleList.as_view(), name='role_list'),
     path('api/role/create/', RoleCreate.as_view(), name='role_create'),
+    path('api/role/<int:pk>/', RoleRetrieve.as_view(), name='role_get'),
+    path('api/role/nearby/', RoleNearby.as_view(), name='role_nearby'),
+    path('api/role/search/', RoleSearch.as_view(), name='role_search'),
+    path('api/role/<int:role_id>/eligible-talents/', RoleEligibleTalents.as_view(), name='role_eligible_talents'),
+    path('api/role/<int:role_id>/stats/', RoleStatsRetrieve.as_view(), name='role_stats'),
     path('api/role/apply/', ApplicationCreate.as_view(), name='application_create'),
+    path('api/role/apply/bulk/', ApplicationBulkCreate.as_view(), name='application_bulk_create'),
+    path('api/role/apply/ticket/<int:pk>/', ApplicationTicketRetrieve.as_view(), name='application_ticket'),
     path('api/role/<int:role_id>/list/', ApplicationList.as_view(), name='application_list'),
+    path('api/role/<int:role_id>/list/async/', async_views.application_list, name='application_list_async'),
 ]